@@ -4,17 +4,44 @@
 """
 
 from .battle_engine import BattleEngine
+from .async_engine import AsyncBattleEngine, QueueActionSource
 from .battle_context import BattleContext
 from .battle_ui import BattleUI
 from .battle_types import BattleResult, BattleAction, TurnPhase, BattleConfig, BattleRewards
+from .rng import BattleRNG
+from .party_battle import PartyBattleEngine, PartyBattleContext, run_party_battle
+from .profiling import BattleProfiler, PROCESS_PROFILE
+from .events import (EventBus, TurnStarted, TurnEnded, DamageDealt, StatusApplied,
+                     SkillCast, CombatantDied)
+from .headless import run_headless_battle, attack_policy, skill_first_policy, random_policy, null_output
 
 __all__ = [
     'BattleEngine',
+    'AsyncBattleEngine',
+    'PartyBattleEngine',
+    'PartyBattleContext',
+    'run_party_battle',
+    'QueueActionSource',
     'BattleContext', 
     'BattleUI',
     'BattleResult',
     'BattleAction',
     'TurnPhase',
     'BattleConfig',
-    'BattleRewards'
+    'BattleRewards',
+    'BattleRNG',
+    'BattleProfiler',
+    'PROCESS_PROFILE',
+    'EventBus',
+    'TurnStarted',
+    'TurnEnded',
+    'DamageDealt',
+    'StatusApplied',
+    'SkillCast',
+    'CombatantDied',
+    'run_headless_battle',
+    'attack_policy',
+    'skill_first_policy',
+    'random_policy',
+    'null_output'
 ]
@@ -0,0 +1,154 @@
+"""行动执行 - 1对1战斗与多人战斗共用的行动结算
+
+引擎只负责决定行动者、目标以及目标本回合是否防御；普通攻击、防御、技能、物品、逃跑
+和敌人AI行动的结算、日志与事件都在 ActionExecutor 中完成，两种战斗的规则因此不会分叉。
+
+上下文需要提供 log_event / set_defending / inflict_status / output / rng / config / events。
+"""
+
+from typing import Any, Dict, Optional, Sequence, Tuple
+from characters.equipments.base_equipments import DamageType
+from .battle_types import BattleAction, TurnPhase
+from .battle_log import MSG_RAW, MSG_ATTACK, MSG_DEFEND, MSG_DEFENDED
+from .events import DamageDealt, SkillCast
+
+# 菜单行动类型
+ACTION_ATTACK = "attack"
+ACTION_DEFEND = "defend"
+ACTION_SKILL = "skill"
+ACTION_ITEM = "item"
+ACTION_FLEE = "flee"
+
+# 需要目标的行动
+TARGETED_ACTIONS = (ACTION_ATTACK, ACTION_SKILL)
+
+# 技能结果标志 -> 战斗状态（由上下文处理）
+# 灼烧、中毒等状态效果由技能附加到目标的 StatusManager，施加成功时由其发布StatusApplied
+SKILL_RESULT_STATUSES = (
+    ('stun_applied', 'stun'),
+)
+
+
+class ActionExecutor:
+    """行动结算（混入战斗引擎，使用引擎的 self.context）"""
+
+    def _resolve_choice(self, action_choice: int, usable_skills: Sequence) -> Tuple[Optional[str], Any]:
+        """菜单编号 -> (行动类型, 技能)
+
+        1=普通攻击, 2=防御, 3..=可用技能, 之后依次为物品、逃跑；无效编号返回 (None, None)。
+        """
+        if action_choice == 1:
+            return ACTION_ATTACK, None
+        if action_choice == 2:
+            return ACTION_DEFEND, None
+        if action_choice <= 2 + len(usable_skills):
+            return ACTION_SKILL, usable_skills[action_choice - 3]
+        if action_choice == 3 + len(usable_skills):
+            return ACTION_ITEM, None
+        if action_choice == 4 + len(usable_skills):
+            return ACTION_FLEE, None
+        return None, None
+
+    def _perform_player_action(self, player, kind: Optional[str], skill, target, defending: bool):
+        """执行玩家方行动，target 只在 TARGETED_ACTIONS 中使用"""
+        context = self.context
+        if kind == ACTION_ATTACK:
+            self._perform_attack(player, target, defending, TurnPhase.PLAYER_TURN)
+            # 触发装备效果
+            self._trigger_on_hit(player, target)
+
+        elif kind == ACTION_DEFEND:
+            context.set_defending(player)
+            context.log_event(TurnPhase.PLAYER_TURN, player.name, BattleAction.DEFEND,
+                              player.name, MSG_DEFEND, (player.name,))
+
+        elif kind == ACTION_SKILL:
+            result = player.use_skill(skill.name, target=target)
+            damage = max(0, result.get("damage", 0))
+            context.log_event(TurnPhase.PLAYER_TURN, player.name, BattleAction.SKILL,
+                              target.name, MSG_RAW, (result["message"],), damage=damage)
+            self._publish_skill(player, target, skill.name, result, damage)
+            # 触发装备效果
+            self._trigger_on_hit(player, target)
+
+        elif kind == ACTION_ITEM:
+            self._use_item()
+
+        elif kind == ACTION_FLEE:
+            self._attempt_flee()
+
+    def _perform_attack(self, attacker, target, defending: bool, phase: TurnPhase) -> int:
+        """普通攻击：max(1, 攻击 - 防御)，目标防御时减半，返回造成的伤害"""
+        damage = max(1, attacker.attack - target.defense)
+        if defending:
+            damage = int(damage * 0.5)
+        target.take_damage(damage, DamageType.PHYSICAL)
+        self.context.log_event(phase, attacker.name, BattleAction.ATTACK, target.name,
+                               MSG_ATTACK, (attacker.name, target.name, damage), damage=damage)
+        self._publish_damage(attacker, target, damage, BattleAction.ATTACK)
+        return damage
+
+    def _perform_enemy_action(self, enemy, target, defending: bool, action: Dict[str, Any]) -> Dict[str, Any]:
+        """执行敌人AI选择的行动并记录结果"""
+        context = self.context
+        result = enemy.execute_action(action)
+
+        template = MSG_RAW
+        damage = 0
+        if 'damage' in result:
+            damage = int(result['damage'])
+            if defending:
+                damage = int(damage * 0.5)
+                template = MSG_DEFENDED
+
+        context.log_event(TurnPhase.ENEMY_TURN, enemy.name, BattleAction.SKILL,
+                          target.name, template, (result['message'],),
+                          damage=damage, heal=result.get('heal_amount', 0))
+        if action['type'] == 'skill':
+            self._publish_skill(enemy, target, action['skill'].name, result, damage)
+        else:
+            self._publish_damage(enemy, target, damage, BattleAction.ATTACK)
+
+        # 技能结果中的状态标志
+        for flag, status in SKILL_RESULT_STATUSES:
+            if result.get(flag):
+                context.inflict_status(enemy, target, status)
+        return result
+
+    def _trigger_on_hit(self, attacker, target):
+        """触发攻击者的装备命中特效"""
+        attacker.trigger_on_hit(target)
+
+    def _publish_damage(self, source, target, damage: int, action: BattleAction):
+        """发布DamageDealt事件（无订阅者时不创建事件）"""
+        events = self.context.events
+        if damage > 0 and events.has_subscribers(DamageDealt):
+            events.publish(DamageDealt(source, target, damage, action))
+
+    def _publish_skill(self, caster, target, skill_name: str, result: Dict[str, Any], damage: int):
+        """发布SkillCast事件，造成伤害时再发布DamageDealt"""
+        events = self.context.events
+        if events.has_subscribers(SkillCast):
+            events.publish(SkillCast(caster, target, skill_name, result))
+        self._publish_damage(caster, target, damage, BattleAction.SKILL)
+
+    def _use_item(self):
+        """使用物品"""
+        # 这里可以扩展物品系统
+        self.context.output("🧪 物品系统暂未实现")
+
+    def _attempt_flee(self) -> bool:
+        """尝试逃跑（多人战斗中为全队逃跑）"""
+        context = self.context
+        if not context.config.allow_flee:
+            context.output("❌ 当前战斗无法逃跑！")
+            return False
+
+        # 50%逃跑成功率
+        if context.rng.random() < 0.5:
+            context.output("🏃 成功逃跑！")
+            context.fled = True
+            return True
+        else:
+            context.output("❌ 逃跑失败！")
+            return False
@@ -0,0 +1,103 @@
+"""异步战斗引擎 - 玩家决策通过 await 从异步行动来源获取
+
+同步的 BattleEngine 在等待玩家输入时会阻塞整个进程；异步引擎在等待玩家行动时
+把控制权交还事件循环，因此一个进程可以同时托管成千上万场等待中的战斗。
+每场战斗仍使用自己的 BattleContext，回合规则与同步引擎完全相同。
+
+    source = QueueActionSource()
+    engine = AsyncBattleEngine(player, enemy, source, output=connection_sink)
+    task = asyncio.create_task(engine.run())
+    ...
+    source.submit(1)   # 例如由网络连接收到玩家选择时调用
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from output_sink import OutputSink
+from .battle_context import BattleContext
+from .battle_engine import BattleEngine
+from .battle_types import BattleConfig, BattleResult, TurnPhase
+from .rng import BattleRNG
+
+# 异步行动来源：接收战斗上下文，返回与战斗菜单一致的行动编号
+ActionSource = Callable[[BattleContext], Awaitable[int]]
+
+
+class QueueActionSource:
+    """基于 asyncio.Queue 的行动来源，由外部（如网络连接）调用 submit() 提交玩家选择"""
+
+    def __init__(self, maxsize: int = 0):
+        self.queue: "asyncio.Queue[int]" = asyncio.Queue(maxsize)
+
+    def submit(self, action_choice: int):
+        """提交一个行动编号（不等待）"""
+        self.queue.put_nowait(action_choice)
+
+    async def __call__(self, context: BattleContext) -> int:
+        return await self.queue.get()
+
+
+class AsyncBattleEngine(BattleEngine):
+    """异步战斗引擎"""
+
+    def __init__(self, player, enemy, action_source: ActionSource,
+                 config: Optional[BattleConfig] = None,
+                 output: Optional[OutputSink] = None,
+                 rng: Optional[BattleRNG] = None,
+                 decision_timeout: Optional[float] = None,
+                 timeout_action: int = 2):
+        """初始化异步战斗引擎
+
+        Args:
+            action_source: 异步行动来源
+            decision_timeout: 每次等待玩家决策的最长秒数，None表示一直等待
+            timeout_action: 超时后代替玩家执行的行动编号，默认防御
+        """
+        super().__init__(player, enemy, config, output=output, rng=rng)
+        self.action_source = action_source
+        self.decision_timeout = decision_timeout
+        self.timeout_action = timeout_action
+
+    async def run(self, include_log: bool = True) -> Tuple[BattleResult, Dict[str, Any]]:
+        """运行战斗直到结束，返回战斗结果和战斗摘要"""
+        self.ui.display_battle_start()
+        output = self.context.output
+        while not self.context.is_battle_over():
+            self.context.next_turn()
+            await self._process_turn_async()
+            output.flush()
+
+        result = self._finish_battle()
+        self.ui.display_battle_end(result)
+        output.flush()
+        return BattleResult(result), self.get_battle_summary(include_log)
+
+    async def _process_turn_async(self):
+        """处理一个回合，玩家决策通过 await 获取"""
+        if self._player_can_act():
+            self.context.current_phase = TurnPhase.PLAYER_TURN
+            action_choice = await self._await_player_choice()
+            self._apply_player_choice(action_choice)
+        self._process_rest_of_turn()
+
+    async def _await_player_choice(self) -> int:
+        """显示行动菜单并等待一个合法的行动编号"""
+        output = self.context.output
+        if output.enabled:
+            self.ui.display_turn_start()
+            max_choice = self.ui.display_action_menu()
+        else:
+            max_choice = 3 + len(self.context.get_usable_skills()) + (1 if self.context.config.allow_flee else 0)
+        output.flush()
+
+        while True:
+            try:
+                choice = await asyncio.wait_for(self.action_source(self.context), self.decision_timeout)
+            except asyncio.TimeoutError:
+                output("⏰ 等待超时，自动执行默认行动")
+                return self.timeout_action
+            if isinstance(choice, int) and 1 <= choice <= max_choice:
+                return choice
+            output(f"❗ 请输入1-{max_choice}之间的数字!")
+            output.flush()
@@ -1,20 +1,73 @@
 """战斗上下文，存储战斗相关的状态和数据"""
 
-from typing import Dict, List, Any, Optional
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from output_sink import OutputSink, as_sink
 from .battle_types import BattleLog, BattleRewards, BattleConfig, TurnPhase, BattleAction
+from .rng import BattleRNG, policy_stream
+from .events import EventBus, TurnStarted, DamageDealt, StatusApplied
+from .battle_log import (ColumnarBattleLog, MSG_BURN, MSG_POISON, MSG_STATUS_TICK, MSG_STATUS_HEAL,
+                         MSG_EFFECT_EXPIRED)
+
+# 状态效果名 -> 每回合伤害的日志模板（参数：角色名, 伤害, 效果名）
+STATUS_TICK_TEMPLATES = {
+    "灼烧": MSG_BURN,
+    "中毒": MSG_POISON,
+}
+
+
+class BattleSnapshot(NamedTuple):
+    """战斗状态快照（扁平结构，只保存可变的数值，不复制角色对象）"""
+    turn_count: int
+    current_phase: TurnPhase
+    player_defending: bool
+    enemy_defending: bool
+    player_stunned: bool
+    enemy_stunned: bool
+    fled: bool
+    rewards: Tuple[int, int, int]
+    log_length: int
+    rng_state: Any
+    policy_rng_state: Any
+    player_state: tuple
+    enemy_state: tuple
+
 
 class BattleContext:
     """战斗上下文，存储战斗过程中的所有状态"""
     
-    def __init__(self, player, enemy, config: BattleConfig = None):
+    # 支持 snapshot()/restore()，可供Boss AI前瞻搜索
+    supports_lookahead = True
+    
+    def __init__(self, player, enemy, config: BattleConfig = None,
+                 output: Optional[OutputSink] = None, rng: Optional[BattleRNG] = None):
         self.player = player
         self.enemy = enemy
         self.config = config or BattleConfig()
+        # 敌人是否由AI选择行动（开战时判断一次，回合中不再反射检查）
+        self.enemy_has_ai = hasattr(enemy, 'select_action') and hasattr(enemy, 'execute_action')
+        
+        # 战斗事件总线，见 events.py
+        self.events = EventBus()
+        
+        # 记录角色原有的随机数流和输出接口，战斗结束后恢复
+        self._saved_bindings = [(c, c.rng, c.output) for c in (player, enemy)]
+        player.battle_context = self
+        enemy.battle_context = self
+        
+        # 所有战斗文本输出都经过这里（同时绑定到双方角色），无头模式可传入NullSink
+        self.output = as_sink(output)
+        self.bind_output(self.output)
+        
+        # 本场战斗的随机数流，所有随机判定都从这里取值
+        self.rng = rng or BattleRNG(self.config.seed)
+        self.bind_rng(self.rng)
+        # 玩家决策函数专用的随机数流，决策函数不从战斗随机数流取值，重放录像时随机判定不会错位
+        self.policy_rng = policy_stream(self.rng)
         
         # 战斗状态
         self.turn_count = 0
         self.current_phase = TurnPhase.BATTLE_START
-        self.battle_log: List[BattleLog] = []
+        self.log = ColumnarBattleLog()
         self.rewards = BattleRewards()
         
         # 临时状态
@@ -22,30 +75,108 @@ class BattleContext:
         self.enemy_defending = False
         self.player_stunned = False
         self.enemy_stunned = False
+        self.fled = False
+        # 灼烧、中毒等状态效果只由双方角色的 StatusManager 管理，每回合结束时结算一次
+        
+        # 阶段计时统计，由 profiling.install 设置（前瞻搜索期间暂停上下文上的计时）
+        self.profiler = None
         
-        # 状态效果
-        self.player_status_effects: Dict[str, int] = {}  # 效果名: 剩余回合
-        self.enemy_status_effects: Dict[str, int] = {}
+    def bind_rng(self, rng: BattleRNG):
+        """设置随机数流并绑定到双方角色（技能、装备、攻击模式通过角色的rng取值）"""
+        self.rng = rng
+        self.player.rng = rng
+        self.enemy.rng = rng
+    
+    def bind_output(self, output: OutputSink):
+        """设置输出接口并绑定到双方角色（装备和状态效果通过角色的output输出）"""
+        self.output = output
+        self.player.output = output
+        self.enemy.output = output
+    
+    def get_usable_skills(self, character=None) -> tuple:
+        """本回合的可用技能快照（默认为玩家）
         
+        战斗菜单、引擎和决策函数都从这里读取，菜单编号 3.. 与引擎执行的技能一一对应。
+        """
+        return (character or self.player).get_usable_skills()
+    
+    def snapshot(self) -> BattleSnapshot:
+        """记录当前战斗状态，可用于前瞻搜索、撤销和试探性执行"""
+        return BattleSnapshot(
+            self.turn_count, self.current_phase,
+            self.player_defending, self.enemy_defending,
+            self.player_stunned, self.enemy_stunned, self.fled,
+            (self.rewards.experience, self.rewards.gold, len(self.rewards.items)),
+            len(self.log),
+            self.rng.getstate(),
+            self.policy_rng.getstate(),
+            self.player.snapshot_state(),
+            self.enemy.snapshot_state(),
+        )
+    
+    def restore(self, snapshot: BattleSnapshot):
+        """恢复到 snapshot() 时的战斗状态（之后产生的日志会被丢弃）"""
+        self.turn_count = snapshot.turn_count
+        self.current_phase = snapshot.current_phase
+        self.player_defending = snapshot.player_defending
+        self.enemy_defending = snapshot.enemy_defending
+        self.player_stunned = snapshot.player_stunned
+        self.enemy_stunned = snapshot.enemy_stunned
+        self.fled = snapshot.fled
+        self.rewards.experience, self.rewards.gold, item_count = snapshot.rewards
+        del self.rewards.items[item_count:]
+        self.log.truncate(snapshot.log_length)
+        self.rng.setstate(snapshot.rng_state)
+        self.policy_rng.setstate(snapshot.policy_rng_state)
+        self.player.restore_state(snapshot.player_state)
+        self.enemy.restore_state(snapshot.enemy_state)
+    
+    def release_combatants(self):
+        """战斗结束后恢复双方角色原有的随机数流和输出接口"""
+        for character, rng, output in self._saved_bindings:
+            character.rng = rng
+            character.output = output
+            character.battle_context = None
+    
+    @property
+    def battle_log(self) -> List[BattleLog]:
+        """以BattleLog对象列表形式返回全部日志（按需生成）"""
+        return list(self.log)
+    
     def add_log(self, log: BattleLog):
         """添加战斗日志"""
-        self.battle_log.append(log)
+        self.log.append_log(log)
         if self.config.show_detailed_log:
-            print(log.message)
+            self.output.write(log.message, turn=log.turn, actor=log.actor, action=log.action.value,
+                              target=log.target, damage=log.damage, heal=log.heal)
+    
+    def log_event(self, phase: TurnPhase, actor: str, action: BattleAction, target: str,
+                  template: int, args: Tuple[Any, ...] = (), damage: int = 0,
+                  heal: int = 0, effect: Optional[str] = None) -> int:
+        """按模板记录一条日志，只有需要显示时才渲染消息文本"""
+        index = self.log.append(self.turn_count, phase, actor, action, target,
+                                template, args, damage, heal, effect)
+        if self.config.show_detailed_log and self.output.enabled:
+            self.output.write(self.log.render(index), turn=self.turn_count, actor=actor,
+                              action=action.value, target=target, damage=damage, heal=heal)
+        return index
     
     def get_last_log(self) -> Optional[BattleLog]:
         """获取最后一条日志"""
-        return self.battle_log[-1] if self.battle_log else None
+        return self.log.last()
     
     def is_battle_over(self) -> bool:
         """检查战斗是否结束"""
-        return (not self.player.is_alive() or 
+        return (self.fled or
+                not self.player.is_alive() or 
                 not self.enemy.is_alive() or 
                 self.turn_count >= self.config.turn_limit)
     
     def get_battle_result(self) -> str:
         """获取战斗结果"""
-        if not self.player.is_alive():
+        if self.fled:
+            return "flee"
+        elif not self.player.is_alive():
             return "defeat"
         elif not self.enemy.is_alive():
             return "victory"
@@ -54,119 +185,61 @@ class BattleContext:
         else:
             return "ongoing"
     
-    def apply_status_effects(self):
-        """应用状态效果"""
-        # 处理玩家状态效果
-        effects_to_remove = []
-        for effect_name, duration in self.player_status_effects.items():
-            if effect_name == "burn":
-                burn_damage = max(1, self.player.max_hp // 10)
-                self.player.take_damage(burn_damage)
-                self.add_log(BattleLog(
-                    turn=self.turn_count,
-                    phase=self.current_phase,
-                    actor="system",
-                    action=BattleAction.ITEM,
-                    target=self.player.name,
-                    damage=burn_damage,
-                    message=f"🔥 {self.player.name}受到{burn_damage}点灼烧伤害！"
-                ))
-            elif effect_name == "poison":
-                poison_damage = max(1, self.player.max_hp // 8)
-                self.player.take_damage(poison_damage)
-                self.add_log(BattleLog(
-                    turn=self.turn_count,
-                    phase=self.current_phase,
-                    actor="system",
-                    action=BattleAction.ITEM,
-                    target=self.player.name,
-                    damage=poison_damage,
-                    message=f"☠️ {self.player.name}受到{poison_damage}点中毒伤害！"
-                ))
-            
-            # 减少持续时间
-            self.player_status_effects[effect_name] = duration - 1
-            if self.player_status_effects[effect_name] <= 0:
-                effects_to_remove.append(effect_name)
-        
-        # 移除过期效果
-        for effect in effects_to_remove:
-            del self.player_status_effects[effect]
-            self.add_log(BattleLog(
-                turn=self.turn_count,
-                phase=self.current_phase,
-                actor="system",
-                action=BattleAction.ITEM,
-                target=self.player.name,
-                message=f"✨ {self.player.name}的{effect}效果已消失！"
-            ))
-        
-        # 处理敌人状态效果（类似逻辑）
-        effects_to_remove = []
-        for effect_name, duration in self.enemy_status_effects.items():
-            if effect_name == "burn":
-                burn_damage = max(1, self.enemy.max_hp // 10)
-                self.enemy.take_damage(burn_damage)
-                self.add_log(BattleLog(
-                    turn=self.turn_count,
-                    phase=self.current_phase,
-                    actor="system",
-                    action=BattleAction.ITEM,
-                    target=self.enemy.name,
-                    damage=burn_damage,
-                    message=f"🔥 {self.enemy.name}受到{burn_damage}点灼烧伤害！"
-                ))
-            elif effect_name == "poison":
-                poison_damage = max(1, self.enemy.max_hp // 8)
-                self.enemy.take_damage(poison_damage)
-                self.add_log(BattleLog(
-                    turn=self.turn_count,
-                    phase=self.current_phase,
-                    actor="system",
-                    action=BattleAction.ITEM,
-                    target=self.enemy.name,
-                    damage=poison_damage,
-                    message=f"☠️ {self.enemy.name}受到{poison_damage}点中毒伤害！"
-                ))
-            
-            self.enemy_status_effects[effect_name] = duration - 1
-            if self.enemy_status_effects[effect_name] <= 0:
-                effects_to_remove.append(effect_name)
-        
-        for effect in effects_to_remove:
-            del self.enemy_status_effects[effect]
-            self.add_log(BattleLog(
-                turn=self.turn_count,
-                phase=self.current_phase,
-                actor="system",
-                action=BattleAction.ITEM,
-                target=self.enemy.name,
-                message=f"✨ {self.enemy.name}的{effect}效果已消失！"
-            ))
-    
-    def add_status_effect(self, target: str, effect_name: str, duration: int):
-        """添加状态效果"""
-        if target == "player":
-            self.player_status_effects[effect_name] = duration
-        elif target == "enemy":
-            self.enemy_status_effects[effect_name] = duration
-    
-    def get_status_effects(self, target: str) -> Dict[str, int]:
-        """获取目标的状态效果"""
-        if target == "player":
-            return self.player_status_effects
-        elif target == "enemy":
-            return self.enemy_status_effects
-        return {}
+    def log_status_ticks(self, character, results: List[Dict[str, Any]]):
+        """把 update_status_effects() 的结算结果写入战斗日志：造成的伤害、治疗和到期移除的效果"""
+        for entry in results:
+            name = entry["effect"]
+            if entry.get("expired"):
+                self.log_event(self.current_phase, "system", BattleAction.ITEM, character.name,
+                               MSG_EFFECT_EXPIRED, (character.name, name), effect=name)
+                continue
+            result = entry["result"]
+            damage = result.get("damage", 0)
+            if damage > 0:
+                template = STATUS_TICK_TEMPLATES.get(name, MSG_STATUS_TICK)
+                self.log_event(self.current_phase, "system", BattleAction.ITEM, character.name,
+                               template, (character.name, damage, name), damage=damage, effect=name)
+                if self.events.has_subscribers(DamageDealt):
+                    self.events.publish(DamageDealt(None, character, damage))
+            heal = result.get("heal", 0)
+            if heal > 0:
+                self.log_event(self.current_phase, "system", BattleAction.ITEM, character.name,
+                               MSG_STATUS_HEAL, (character.name, heal, name), heal=heal, effect=name)
+    
+    def set_defending(self, character):
+        """角色进入防御姿态，本回合受到的伤害减半"""
+        if character is self.player:
+            self.player_defending = True
+        else:
+            self.enemy_defending = True
+    
+    def inflict_status(self, source, target, status: str):
+        """技能结果标志中的战斗状态：stun 使目标跳过下一次行动，并发布StatusApplied事件"""
+        if status == "stun":
+            side = "player" if target is self.player else "enemy"
+            setattr(self, f"{side}_stunned", True)
+        if self.events.has_subscribers(StatusApplied):
+            self.events.publish(StatusApplied(source, target, status, 1))
+    
+    def status_applied(self, target, effect):
+        """StatusManager 成功施加（或刷新/叠加）状态效果后调用，发布StatusApplied事件"""
+        if self.events.has_subscribers(StatusApplied):
+            if self.current_phase is TurnPhase.PLAYER_TURN:
+                source = self.player
+            elif self.current_phase is TurnPhase.ENEMY_TURN:
+                source = self.enemy
+            else:
+                source = None
+            self.events.publish(StatusApplied(source, target, effect.name,
+                                              effect.remaining_duration, effect))
     
     def next_turn(self):
         """进入下一回合"""
         self.turn_count += 1
         self.player_defending = False
         self.enemy_defending = False
-        
-        # 应用状态效果
-        self.apply_status_effects()
+        if self.events.has_subscribers(TurnStarted):
+            self.events.publish(TurnStarted(self.turn_count))
     
     def reset_defense_flags(self):
         """重置防御标志"""
@@ -1,45 +1,197 @@
 """战斗引擎核心类"""
 
-import random
-from typing import Optional, List, Dict, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from characters.equipments.base_equipments import DamageType
-from .battle_types import BattleAction, BattleResult, BattleLog, TurnPhase, BattleRewards
+from output_sink import OutputSink
+from .actions import ActionExecutor
+from .battle_types import BattleAction, BattleResult, TurnPhase, BattleRewards
 from .battle_context import BattleContext
+from .rng import BattleRNG
+from .battle_log import MSG_FAST_FORWARD
 from .battle_ui import BattleUI
+from .events import TurnEnded, CombatantDied
+from . import profiling
 
-class BattleEngine:
-    """战斗引擎核心类"""
+
+class BattleEngine(ActionExecutor):
+    """战斗引擎核心类（行动结算见 actions.ActionExecutor）"""
     
-    def __init__(self, player, enemy, config=None):
-        """初始化战斗引擎"""
-        self.context = BattleContext(player, enemy, config)
+    def __init__(self, player, enemy, config=None,
+                 player_policy: Optional[Callable[[BattleContext], int]] = None,
+                 output: Optional[OutputSink] = None,
+                 rng: Optional[BattleRNG] = None):
+        """初始化战斗引擎
+        
+        Args:
+            player_policy: 玩家决策函数，接收BattleContext并返回行动编号；
+                为None时通过BattleUI读取键盘输入
+            output: 战斗文本输出接口（也接受print风格函数），默认输出到控制台
+            rng: 战斗随机数流，为None时按config.seed创建
+        """
+        self.context = BattleContext(player, enemy, config, output, rng)
         self.ui = BattleUI(self.context)
+        self.player_policy = player_policy
+        self.recorder = None  # 战斗录像记录器，见 replay.BattleRecorder
+        # 阶段计时统计，仅在 config.profile 为True时安装，见 profiling.py
+        self.profiler = profiling.install(self) if self.context.config.profile else None
+    
+    @classmethod
+    def from_context(cls, context: BattleContext,
+                     player_policy: Optional[Callable[[BattleContext], int]] = None) -> "BattleEngine":
+        """在已有的战斗上下文上创建引擎（不重新绑定角色），供AI前瞻搜索按相同规则推演"""
+        engine = cls.__new__(cls)
+        engine.context = context
+        engine.ui = BattleUI(context)
+        engine.player_policy = player_policy
+        engine.recorder = None
+        engine.profiler = None
+        return engine
         
     def start_battle(self) -> BattleResult:
         """开始战斗"""
         self.ui.display_battle_start()
         
+        result = self._run_until_over()
+        self.ui.display_battle_end(result)
+        
+        return result
+    
+    def run_headless(self, include_log: bool = True) -> Tuple[BattleResult, Dict[str, Any]]:
+        """无交互地运行战斗，返回战斗结果和战斗摘要
+        
+        玩家行动完全由player_policy决定，不调用input()，也不显示开场和回合界面。
+        include_log为False时摘要中不包含逐条日志。
+        """
+        if self.player_policy is None:
+            raise ValueError("无头战斗需要提供player_policy")
+        
+        result = self._run_until_over()
+        return BattleResult(result), self.get_battle_summary(include_log)
+    
+    def _run_until_over(self) -> str:
+        """执行回合直到战斗结束并结算结果（交互与无头模式共用）"""
+        output = self.context.output
         while not self.context.is_battle_over():
+            if self._can_fast_forward():
+                self._fast_forward()
+                break
             self.context.next_turn()
             self._process_turn()
+            output.flush()
+        output.flush()
+        
+        return self._finish_battle()
+    
+    def _can_fast_forward(self) -> bool:
+        """剩余战斗是否已完全确定：双方只会普通攻击，且没有状态效果、眩晕和装备特效"""
+        context = self.context
+        policy = self.player_policy
+        if (not context.config.fast_forward or policy is None or self.recorder is not None
+                or context.events.has_any_subscribers()
+                or context.player_stunned or context.enemy_stunned):
+            return False
         
+        player, enemy = context.player, context.enemy
+        if player.on_hit_handlers or len(player.status_manager) or len(enemy.status_manager):
+            return False
+        if not getattr(policy, 'always_attacks', False):
+            if not (getattr(policy, 'attacks_without_skills', False) and self._skills_locked(player)):
+                return False
+        if context.enemy_has_ai:
+            return self._skills_locked(enemy)
+        return True
+    
+    @staticmethod
+    def _skills_locked(character) -> bool:
+        """角色的技能在本场战斗中是否都不可能再使用（等级不足或法力不足，且法力不会恢复）"""
+        return all(skill.level_requirement > character.level or skill.mp_cost > character.mp
+                   for skill in character.skills)
+    
+    def _fast_forward(self):
+        """直接计算只剩普通攻击交换的战斗结果，并记录一条汇总日志
+        
+        每回合玩家先攻击；战斗未结束且未到回合上限时敌人再攻击。
+        """
+        context = self.context
+        player, enemy = context.player, context.enemy
+        remaining = context.config.turn_limit - context.turn_count
+        
+        player_damage = max(1, player.attack - enemy.defense)
+        if context.enemy_has_ai:
+            enemy_damage = enemy.attack  # 敌人AI的普通攻击按攻击力直接造成伤害
+        else:
+            enemy_damage = max(1, enemy.attack - player.defense)
+        
+        hits_to_kill_enemy = -(-enemy.hp // player_damage)
+        hits_to_kill_player = -(-player.hp // enemy_damage) if enemy_damage > 0 else remaining + 1
+        
+        if hits_to_kill_enemy <= remaining and hits_to_kill_enemy <= hits_to_kill_player:
+            turns = hits_to_kill_enemy
+            player_hits, enemy_hits, completed_turns = turns, turns - 1, turns - 1
+            phase = TurnPhase.PLAYER_TURN
+        elif hits_to_kill_player < hits_to_kill_enemy and hits_to_kill_player < remaining:
+            turns = hits_to_kill_player
+            player_hits, enemy_hits, completed_turns = turns, turns, turns
+            phase = TurnPhase.ENEMY_TURN
+        else:
+            turns = remaining
+            player_hits, enemy_hits, completed_turns = turns, turns - 1, turns - 1
+            phase = TurnPhase.PLAYER_TURN
+        
+        enemy.take_damage(player_damage * player_hits, DamageType.PHYSICAL)
+        player.take_damage(enemy_damage * enemy_hits, DamageType.PHYSICAL)
+        
+        # 完整结束的回合会推进技能冷却
+        for character in (player, enemy):
+            for skill in character.skills:
+                skill.current_cooldown = max(0, skill.current_cooldown - completed_turns)
+        
+        context.turn_count += turns
+        context.current_phase = phase
+        context.player_defending = False
+        context.enemy_defending = False
+        context.log_event(phase, player.name, BattleAction.ATTACK, enemy.name, MSG_FAST_FORWARD,
+                          (turns, player.name, player_hits, player_damage * player_hits,
+                           enemy.name, enemy_hits, enemy_damage * enemy_hits),
+                          damage=player_damage * player_hits)
+    
+    def _finish_battle(self) -> str:
+        """结算战斗结果并释放双方角色"""
         result = self.context.get_battle_result()
-        self.ui.display_battle_end(result)
         
         # 处理战斗结果
         self._process_battle_result(result)
+        if self.recorder is not None:
+            self.recorder.record_result(self.context, result)
+        if self.profiler is not None:
+            profiling.PROCESS_PROFILE.merge(self.profiler)
+        events = self.context.events
+        if events.has_subscribers(CombatantDied):
+            for combatant in (self.context.player, self.context.enemy):
+                if not combatant.is_alive():
+                    events.publish(CombatantDied(combatant))
+        self.context.release_combatants()
         
         return result
     
     def _process_turn(self):
         """处理一个回合"""
         # 玩家回合
-        if not self.context.player_stunned:
+        if self._player_can_act():
             self._process_player_turn()
-        else:
-            print(f"\n💫 {self.context.player.name}被眩晕，无法行动！")
-            self.context.player_stunned = False
-        
+        self._process_rest_of_turn()
+    
+    def _player_can_act(self) -> bool:
+        """玩家本回合能否行动（被眩晕时消耗眩晕并跳过）"""
+        if not self.context.player_stunned:
+            return True
+        if self.context.output.enabled:
+            self.context.output(f"\n💫 {self.context.player.name}被眩晕，无法行动！")
+        self.context.player_stunned = False
+        return False
+    
+    def _process_rest_of_turn(self):
+        """玩家行动之后的部分：敌人回合与回合结束结算"""
         if self.context.is_battle_over():
             return
         
@@ -47,92 +199,49 @@ class BattleEngine:
         if not self.context.enemy_stunned:
             self._process_enemy_turn()
         else:
-            print(f"\n💫 {self.context.enemy.name}被眩晕，无法行动！")
+            if self.context.output.enabled:
+                self.context.output(f"\n💫 {self.context.enemy.name}被眩晕，无法行动！")
             self.context.enemy_stunned = False
         
-        # 回合结束时更新状态（包括技能冷却）
-        self.context.player.update_status_effects()
-        self.context.enemy.update_status_effects()
+        self._end_turn()
+    
+    def _end_turn(self):
+        """回合结束时更新状态（包括技能冷却）"""
+        context = self.context
+        for character in (context.player, context.enemy):
+            results = character.update_status_effects()
+            if results:
+                context.log_status_ticks(character, results)
+        if context.events.has_subscribers(TurnEnded):
+            context.events.publish(TurnEnded(context.turn_count))
     
     def _process_player_turn(self):
         """处理玩家回合"""
         self.context.current_phase = TurnPhase.PLAYER_TURN
         
-        # 显示回合信息
-        self.ui.display_turn_start()
-        
         # 获取玩家行动
-        action_choice = self.ui.display_player_actions()
+        if self.player_policy is not None:
+            action_choice = self.player_policy(self.context)
+        else:
+            # 显示回合信息
+            self.ui.display_turn_start()
+            action_choice = self.ui.display_player_actions()
+        
+        self._apply_player_choice(action_choice)
+    
+    def _apply_player_choice(self, action_choice: int):
+        """记录并执行玩家选择的行动"""
+        if self.recorder is not None:
+            self.recorder.record_player_action(action_choice)
         
         # 执行玩家行动
         self._execute_player_action(action_choice)
     
     def _execute_player_action(self, action_choice: int):
         """执行玩家行动"""
-        player = self.context.player
-        enemy = self.context.enemy
-        
-        # 获取可用技能
-        usable_skills = [s for s in player.skills if s.can_use(player)]
-        
-        if action_choice == 1:  # 普通攻击
-            damage = max(1, player.attack - enemy.defense)
-            enemy.take_damage(damage, DamageType.PHYSICAL)
-            
-            log = BattleLog(
-                turn=self.context.turn_count,
-                phase=TurnPhase.PLAYER_TURN,
-                actor=player.name,
-                action=BattleAction.ATTACK,
-                target=enemy.name,
-                damage=damage,
-                message=f"💥 {player.name}对{enemy.name}造成了{damage}点物理伤害！"
-            )
-            self.context.add_log(log)
-            
-            # 触发装备效果
-            self._trigger_equipment_effects(player, enemy)
-            
-        elif action_choice == 2:  # 防御
-            self.context.player_defending = True
-            log = BattleLog(
-                turn=self.context.turn_count,
-                phase=TurnPhase.PLAYER_TURN,
-                actor=player.name,
-                action=BattleAction.DEFEND,
-                target=player.name,
-                message=f"🛡️ {player.name}进入了防御姿态！"
-            )
-            self.context.add_log(log)
-            
-        elif action_choice <= 2 + len(usable_skills):  # 使用技能
-            skill_index = action_choice - 3
-            skill = usable_skills[skill_index]
-            
-            result = player.use_skill(skill.name, target=enemy)
-            
-            log = BattleLog(
-                turn=self.context.turn_count,
-                phase=TurnPhase.PLAYER_TURN,
-                actor=player.name,
-                action=BattleAction.SKILL,
-                target=enemy.name,
-                message=result["message"]
-            )
-            self.context.add_log(log)
-            
-            if result.get("damage", 0) > 0:
-                log.damage = result["damage"]
-                
-            # 触发装备效果
-            self._trigger_equipment_effects(player, enemy)
-            
-        elif action_choice == 3 + len(usable_skills):  # 使用物品
-            self._use_item()
-            
-        elif action_choice == 4 + len(usable_skills):  # 逃跑
-            if self._attempt_flee():
-                return
+        context = self.context
+        kind, skill = self._resolve_choice(action_choice, context.get_usable_skills())
+        self._perform_player_action(context.player, kind, skill, context.enemy, context.enemy_defending)
     
     def _process_enemy_turn(self):
         """处理敌人回合"""
@@ -142,101 +251,23 @@ class BattleEngine:
         player = self.context.player
         
         # Boss使用技能系统
-        if hasattr(enemy, 'select_action') and hasattr(enemy, 'execute_action'):
-            action = enemy.select_action(player)
-            result = enemy.execute_action(action)
-            
-            log = BattleLog(
-                turn=self.context.turn_count,
-                phase=TurnPhase.ENEMY_TURN,
-                actor=enemy.name,
-                action=BattleAction.SKILL,
-                target=player.name,
-                message=result['message']
-            )
-            
-            if 'damage' in result:
-                damage = int(result['damage'])
-                if self.context.player_defending:
-                    damage = int(damage * 0.5)
-                    log.message += f" (防御减少50%伤害)"
-                log.damage = damage
-                
-            if 'heal_amount' in result:
-                log.heal = result['heal_amount']
-                
-            self.context.add_log(log)
-            
-            # 处理状态效果
-            if result.get('burn_applied'):
-                self.context.add_status_effect("player", "burn", 3)
-            if result.get('poison_applied'):
-                self.context.add_status_effect("player", "poison", 3)
-            if result.get('stun_applied'):
-                self.context.player_stunned = True
-                
+        if self.context.enemy_has_ai:
+            action = self._select_enemy_action(enemy, player)
+            self._execute_enemy_action(action)
         else:  # 普通敌人攻击
-            damage = max(1, enemy.attack - player.defense)
-            if self.context.player_defending:
-                damage = int(damage * 0.5)
-                
-            player.take_damage(damage, DamageType.PHYSICAL)
-            
-            log = BattleLog(
-                turn=self.context.turn_count,
-                phase=TurnPhase.ENEMY_TURN,
-                actor=enemy.name,
-                action=BattleAction.ATTACK,
-                target=player.name,
-                damage=damage,
-                message=f"💥 {enemy.name}对{player.name}造成了{damage}点物理伤害！"
-            )
-            self.context.add_log(log)
-    
-    def _trigger_equipment_effects(self, attacker, target):
-        """触发装备效果"""
-        for equipment in attacker.equipment.values():
-            if equipment and hasattr(equipment, 'effects'):
-                for effect in equipment.effects:
-                    effect_class = effect.__class__.__name__
-                    
-                    # 处理不同类型的装备效果
-                    if effect_class == 'DamageEffect':
-                        scale_value = getattr(attacker, effect.scale_stat.name.lower(), 0)
-                        extra_damage = int(scale_value * effect.coefficient)
-                        if extra_damage > 0:
-                            target.take_damage(extra_damage, effect.dmg_type)
-                            print(f"[{equipment.name}] 追加 {extra_damage} {effect.dmg_type.name} 伤害!")
-                    
-                    elif effect_class == 'ManaSurgeEffect':
-                        if random.random() < effect.chance:
-                            attacker.mp = min(attacker.mp + effect.mana_restore, attacker.max_mp)
-                            print(f"[{equipment.name}] 恢复了 {effect.mana_restore} 点法力值!")
-                    
-                    elif effect_class == 'ArcaneExplosionEffect':
-                        if random.random() < effect.chance:
-                            damage = int(attacker.spell_power * effect.damage_scale)
-                            target.take_damage(damage, DamageType.MAGICAL)
-                            print(f"[{equipment.name}] 引发奥术爆炸，造成 {damage} 点额外魔法伤害!")
+            self._perform_attack(enemy, player, self.context.player_defending, TurnPhase.ENEMY_TURN)
     
-    def _use_item(self):
-        """使用物品"""
-        # 这里可以扩展物品系统
-        print("🧪 物品系统暂未实现")
+    def _execute_enemy_action(self, action: Dict[str, Any]):
+        """执行敌人AI选择的行动并记录结果"""
+        context = self.context
+        self._perform_enemy_action(context.enemy, context.player, context.player_defending, action)
     
-    def _attempt_flee(self) -> bool:
-        """尝试逃跑"""
-        if not self.context.config.allow_flee:
-            print("❌ 当前战斗无法逃跑！")
-            return False
-            
-        # 50%逃跑成功率
-        if random.random() < 0.5:
-            print("🏃 成功逃跑！")
-            return True
-        else:
-            print("❌ 逃跑失败！")
-            return False
+    def _select_enemy_action(self, enemy, player) -> Dict[str, Any]:
+        """由敌人AI选择行动（录像回放等场景可在子类中改写）"""
+        action = enemy.select_action(player)
+        if self.recorder is not None:
+            self.recorder.record_enemy_action(enemy, action)
+        return action
     
     def _process_battle_result(self, result: str):
         """处理战斗结果"""
@@ -254,21 +285,25 @@ class BattleEngine:
             self.context.player.gain_experience(exp_reward)
             
             # 如果是Boss，标记为已击败
-            if hasattr(enemy, '__class__') and 'FloorBoss' in str(type(enemy)):
+            if getattr(enemy, 'is_floor_boss', False):
                 if hasattr(self.context.player, 'defeated_bosses'):
                     self.context.player.defeated_bosses.add(
                         getattr(self.context.player, 'current_floor', 1)
                     )
     
-    def get_battle_summary(self) -> Dict[str, Any]:
-        """获取战斗摘要"""
-        return {
+    def get_battle_summary(self, include_log: bool = True) -> Dict[str, Any]:
+        """获取战斗摘要，include_log为False时省略逐条日志（不渲染任何消息）"""
+        summary = {
             "result": self.context.get_battle_result(),
             "turns": self.context.turn_count,
             "rewards": {
                 "experience": self.context.rewards.experience,
                 "gold": self.context.rewards.gold,
                 "items": self.context.rewards.items
-            },
-            "log": [log.__dict__ for log in self.context.battle_log]
+            }
         }
+        if include_log:
+            summary["log"] = self.context.log.to_dicts()
+        if self.profiler is not None:
+            summary["profile"] = self.profiler.report()
+        return summary
@@ -0,0 +1,140 @@
+"""列式战斗日志 - 按列存储日志字段，消息文本在需要时才由模板渲染"""
+
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from .battle_types import BattleAction, BattleLog, TurnPhase
+
+# 消息模板表：模板编号 -> 格式字符串（参数按位置填入）
+LOG_TEMPLATES: List[str] = []
+
+
+def register_template(fmt: str) -> int:
+    """注册消息模板并返回模板编号"""
+    LOG_TEMPLATES.append(fmt)
+    return len(LOG_TEMPLATES) - 1
+
+
+# 内置模板
+MSG_RAW = register_template("{0}")
+MSG_ATTACK = register_template("💥 {0}对{1}造成了{2}点物理伤害！")
+MSG_DEFEND = register_template("🛡️ {0}进入了防御姿态！")
+MSG_DEFENDED = register_template("{0} (防御减少50%伤害)")
+MSG_BURN = register_template("🔥 {0}受到{1}点灼烧伤害！")
+MSG_POISON = register_template("☠️ {0}受到{1}点中毒伤害！")
+MSG_EFFECT_EXPIRED = register_template("✨ {0}的{1}效果已消失！")
+MSG_STATUS_TICK = register_template("✨ {0}受到{1}点{2}伤害！")
+MSG_STATUS_HEAL = register_template("💚 {0}通过{2}恢复了{1}点生命值！")
+MSG_FAST_FORWARD = register_template("⏩ 快进{0}回合：{1}普通攻击{2}次，共造成{3}点伤害；{4}攻击{5}次，共造成{6}点伤害")
+
+_PHASES = list(TurnPhase)
+_PHASE_IDS = {phase: i for i, phase in enumerate(_PHASES)}
+_ACTIONS = list(BattleAction)
+_ACTION_IDS = {action: i for i, action in enumerate(_ACTIONS)}
+
+
+class ColumnarBattleLog:
+    """列式战斗日志
+
+    数值字段存放在类型化数组中，角色名等字符串存入去重的字符串表，
+    每条日志只额外保存一个模板参数元组。消息文本仅在 render() 时生成。
+    """
+
+    def __init__(self):
+        self.turns = array('i')
+        self.phases = array('b')
+        self.actors = array('i')
+        self.actions = array('b')
+        self.targets = array('i')
+        self.damages = array('i')
+        self.heals = array('i')
+        self.effects = array('i')     # 字符串表编号，-1表示无
+        self.templates = array('i')
+        self.args: List[Tuple[Any, ...]] = []
+
+        self.strings: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+
+    def intern(self, text: str) -> int:
+        """把字符串放入字符串表并返回编号"""
+        string_id = self._string_ids.get(text)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.strings.append(text)
+            self._string_ids[text] = string_id
+        return string_id
+
+    def append(self, turn: int, phase: TurnPhase, actor: str, action: BattleAction,
+               target: str, template: int = MSG_RAW, args: Tuple[Any, ...] = (),
+               damage: int = 0, heal: int = 0, effect: Optional[str] = None) -> int:
+        """追加一条日志并返回其序号"""
+        self.turns.append(turn)
+        self.phases.append(_PHASE_IDS[phase])
+        self.actors.append(self.intern(actor))
+        self.actions.append(_ACTION_IDS[action])
+        self.targets.append(self.intern(target))
+        self.damages.append(damage)
+        self.heals.append(heal)
+        self.effects.append(-1 if effect is None else self.intern(effect))
+        self.templates.append(template)
+        self.args.append(args)
+        return len(self.templates) - 1
+
+    def append_log(self, log: BattleLog) -> int:
+        """追加一条已构造好的BattleLog（消息按原文保存）"""
+        return self.append(log.turn, log.phase, log.actor, log.action, log.target,
+                           MSG_RAW, (log.message,), log.damage, log.heal, log.effect)
+
+    def render(self, index: int) -> str:
+        """渲染指定日志的消息文本"""
+        return LOG_TEMPLATES[self.templates[index]].format(*self.args[index])
+
+    def entry(self, index: int) -> BattleLog:
+        """把指定日志还原为BattleLog对象"""
+        effect_id = self.effects[index]
+        return BattleLog(
+            turn=self.turns[index],
+            phase=_PHASES[self.phases[index]],
+            actor=self.strings[self.actors[index]],
+            action=_ACTIONS[self.actions[index]],
+            target=self.strings[self.targets[index]],
+            damage=self.damages[index],
+            heal=self.heals[index],
+            effect=None if effect_id < 0 else self.strings[effect_id],
+            message=self.render(index)
+        )
+
+    def last(self) -> Optional[BattleLog]:
+        return self.entry(len(self) - 1) if len(self) else None
+
+    def truncate(self, length: int):
+        """丢弃序号 >= length 的日志（字符串表保留）"""
+        for column in (self.turns, self.phases, self.actors, self.actions, self.targets,
+                       self.damages, self.heals, self.effects, self.templates):
+            del column[length:]
+        del self.args[length:]
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """按列批量生成与 BattleLog.__dict__ 结构相同的字典列表"""
+        strings = self.strings
+        return [
+            {
+                "turn": turn,
+                "phase": _PHASES[phase],
+                "actor": strings[actor],
+                "action": _ACTIONS[action],
+                "target": strings[target],
+                "damage": damage,
+                "heal": heal,
+                "effect": None if effect < 0 else strings[effect],
+                "message": LOG_TEMPLATES[template].format(*args),
+            }
+            for turn, phase, actor, action, target, damage, heal, effect, template, args
+            in zip(self.turns, self.phases, self.actors, self.actions, self.targets,
+                   self.damages, self.heals, self.effects, self.templates, self.args)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.templates)
+
+    def __iter__(self) -> Iterator[BattleLog]:
+        return (self.entry(i) for i in range(len(self)))
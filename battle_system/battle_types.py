@@ -57,3 +57,6 @@ class BattleConfig:
     show_detailed_log: bool = True
     auto_battle: bool = False
     turn_limit: int = 100
+    seed: Optional[int] = None  # 战斗随机种子，None表示随机生成
+    fast_forward: bool = True   # 无头模式下剩余战斗已确定时直接计算结果
+    profile: bool = False       # 统计各战斗阶段耗时（见 profiling.py）
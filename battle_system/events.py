@@ -0,0 +1,111 @@
+"""战斗事件总线 - 按事件类型分发的订阅机制
+
+装备、状态效果、统计工具等可以订阅战斗中发生的事件，而不需要引擎为它们单独编写分支：
+
+    def on_damage(event: DamageDealt):
+        ...
+    context.events.subscribe(DamageDealt, on_damage)
+
+事件只分发给订阅了该类型的处理函数；没有订阅者时引擎不会创建事件对象。
+AI前瞻推演期间事件总线会被临时替换为空总线，订阅者只会收到真实战斗中的事件。
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Type
+
+
+@dataclass(slots=True)
+class TurnStarted:
+    """回合开始（回合数已递增；状态效果只在回合结束时由双方的 StatusManager 结算）"""
+    turn: int
+
+
+@dataclass(slots=True)
+class TurnEnded:
+    """回合结束（双方状态效果与技能冷却已更新）"""
+    turn: int
+
+
+@dataclass(slots=True)
+class DamageDealt:
+    """造成伤害，source为None表示状态效果等系统伤害"""
+    source: Any
+    target: Any
+    amount: int
+    action: Any = None
+
+
+@dataclass(slots=True)
+class StatusApplied:
+    """附加（或刷新/叠加）状态效果成功，被互斥拒绝的施加不会发出
+
+    由目标的 StatusManager.add_status 在成功时发出，status 为效果名，duration 为施加后的剩余回合，
+    effect 为目标身上的效果对象；眩晕（stun）不是状态效果，由技能结果标志发出，effect为None。
+    source 为当前行动者（回合结束结算等时机为None）。
+    """
+    source: Any
+    target: Any
+    status: str
+    duration: int
+    effect: Any = None
+
+
+@dataclass(slots=True)
+class SkillCast:
+    """释放技能，result为技能返回的结果字典"""
+    caster: Any
+    target: Any
+    skill_name: str
+    result: Dict[str, Any]
+
+
+@dataclass(slots=True)
+class CombatantDied:
+    """战斗者倒下（战斗结算时发出）"""
+    combatant: Any
+
+
+Handler = Callable[[Any], None]
+
+
+class EventBus:
+    """按事件类型分发的事件总线"""
+
+    def __init__(self):
+        self._handlers: Dict[Type, List[Handler]] = {}
+
+    def subscribe(self, event_type: Type, handler: Handler) -> Handler:
+        """订阅某类事件，返回handler以便用作装饰器"""
+        self._handlers.setdefault(event_type, []).append(handler)
+        return handler
+
+    def unsubscribe(self, event_type: Type, handler: Handler) -> bool:
+        """取消订阅，返回是否找到该订阅"""
+        handlers = self._handlers.get(event_type)
+        if not handlers or handler not in handlers:
+            return False
+        handlers.remove(handler)
+        if not handlers:
+            del self._handlers[event_type]
+        return True
+
+    def has_subscribers(self, event_type: Type) -> bool:
+        """是否有订阅者（发布方据此跳过事件对象的创建）"""
+        return event_type in self._handlers
+
+    def has_any_subscribers(self) -> bool:
+        return bool(self._handlers)
+
+    def publish(self, event: Any):
+        """把事件分发给订阅了其类型的所有处理函数"""
+        handlers = self._handlers.get(type(event))
+        if handlers:
+            for handler in handlers:
+                handler(event)
+
+    def clear(self, event_type: Optional[Type] = None):
+        """清除某类或全部订阅"""
+        if event_type is None:
+            self._handlers.clear()
+        else:
+            self._handlers.pop(event_type, None)
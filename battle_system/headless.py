@@ -0,0 +1,72 @@
+"""无头战斗运行 - 不读取键盘、不输出文本，用于批量平衡测试和服务端结算"""
+
+from typing import Any, Callable, Dict, Optional, Tuple
+from output_sink import NULL_SINK, OutputSink
+from .battle_types import BattleConfig, BattleResult
+from .battle_context import BattleContext
+from .battle_engine import BattleEngine
+from .rng import BattleRNG
+
+# 玩家决策函数：接收战斗上下文，返回与BattleUI菜单一致的行动编号
+# 1=普通攻击, 2=防御, 3..=可用技能, 之后依次为物品、逃跑
+# 需要随机数的决策函数应从 context.policy_rng 取值，不要使用战斗随机数流 context.rng
+PlayerPolicy = Callable[[BattleContext], int]
+
+
+# 静默输出，丢弃所有战斗文本
+null_output = NULL_SINK
+
+
+def attack_policy(context: BattleContext) -> int:
+    """始终使用普通攻击"""
+    return 1
+
+
+# 决策函数的可选标记，供引擎判断剩余战斗是否可以快进：
+#   always_attacks          - 总是返回1
+#   attacks_without_skills  - 没有可用技能时总是返回1
+attack_policy.always_attacks = True
+
+
+def skill_first_policy(context: BattleContext) -> int:
+    """有可用技能时使用第一个可用技能，否则普通攻击"""
+    if context.get_usable_skills():
+        return 3
+    return 1
+
+
+skill_first_policy.attacks_without_skills = True
+
+
+def random_policy(context: BattleContext) -> int:
+    """在普通攻击、防御和可用技能中随机选择（用作AI推演中的玩家模型）
+
+    从决策函数专用的 context.policy_rng 取值，不影响敌人AI和装备特效的随机判定。
+    """
+    return context.policy_rng.randint(1, 2 + len(context.get_usable_skills()))
+
+
+def run_headless_battle(player, enemy, policy: PlayerPolicy = attack_policy,
+                        config: BattleConfig = None,
+                        output: OutputSink = NULL_SINK,
+                        rng: Optional[BattleRNG] = None,
+                        include_log: bool = True
+                        ) -> Tuple[BattleResult, Dict[str, Any]]:
+    """运行一场无头战斗
+
+    Args:
+        player: 玩家角色
+        enemy: 敌人
+        policy: 玩家决策函数
+        config: 战斗配置，默认关闭详细日志
+        output: 输出接口，默认静默
+        rng: 战斗随机数流，为None时按config.seed创建
+        include_log: 摘要中是否包含逐条日志
+
+    Returns:
+        (战斗结果, 战斗摘要)
+    """
+    if config is None:
+        config = BattleConfig(show_detailed_log=False)
+    engine = BattleEngine(player, enemy, config, player_policy=policy, output=output, rng=rng)
+    return engine.run_headless(include_log)
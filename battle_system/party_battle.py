@@ -0,0 +1,376 @@
+"""多人战斗 - N对M战斗，按速度由堆调度行动顺序
+
+每个战斗者按速度得到行动间隔：速度100每轮行动一次，速度200每轮两次。
+调度器用二叉堆按"下次行动时间"取出下一个行动者，每次行动的调度开销为 O(log n)；
+同一时刻先玩家方后敌方，同方按加入顺序。
+每方维护存活战斗者索引，随机选取目标和移除倒下的战斗者都是 O(1)；
+倒下者在堆中的条目不立即删除，轮到时直接跳过（惰性删除）。
+
+多人战斗只支持无头运行（玩家方由决策函数控制），headless.py 中的决策函数可直接使用：
+决策时 context.get_usable_skills() 返回当前行动者的可用技能。
+"""
+
+import heapq
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from output_sink import OutputSink, as_sink
+from .actions import ActionExecutor, TARGETED_ACTIONS
+from .battle_types import BattleAction, BattleConfig, BattleResult, BattleRewards, TurnPhase
+from .battle_context import BattleContext
+from .battle_log import ColumnarBattleLog
+from .events import EventBus, TurnStarted, StatusApplied, CombatantDied
+from .rng import BattleRNG, policy_stream
+
+PLAYER_SIDE = 0
+ENEMY_SIDE = 1
+
+BASE_SPEED = 100     # 每轮行动一次的速度
+ROUND_TICKS = 1000   # 每轮的调度时间单位数
+MIN_SPEED_RATIO = 0.1  # 减速效果最多把速度降到原来的10%
+
+
+class Combatant:
+    """战斗中的一个参与者及其本场战斗的临时状态"""
+
+    __slots__ = ("character", "side", "index", "policy", "has_ai",
+                 "stunned", "defending", "alive_pos")
+
+    def __init__(self, character, side: int, index: int, policy: Optional[Callable] = None):
+        self.character = character
+        self.side = side
+        self.index = index
+        self.policy = policy
+        self.has_ai = hasattr(character, 'select_action') and hasattr(character, 'execute_action')
+        self.stunned = False
+        self.defending = False
+        self.alive_pos = -1  # 在本方存活索引中的位置，-1表示已倒下
+
+    @property
+    def alive(self) -> bool:
+        return self.alive_pos >= 0
+
+    @property
+    def speed(self) -> float:
+        """当前速度（基础速度受减速效果影响）"""
+        character = self.character
+        reduction = character.status_manager.get_total_effect_value('speed_reduction') / 100
+        return getattr(character, 'speed', BASE_SPEED) * max(MIN_SPEED_RATIO, 1 - reduction)
+
+    @property
+    def interval(self) -> int:
+        """两次行动之间的调度时间"""
+        return max(1, int(ROUND_TICKS * BASE_SPEED / self.speed))
+
+
+class InitiativeScheduler:
+    """按下次行动时间排序的行动队列（二叉堆）"""
+
+    def __init__(self):
+        self._heap: List[Tuple[int, int, int, Combatant]] = []
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def schedule(self, combatant: Combatant, time: int):
+        """安排战斗者在time时行动"""
+        heapq.heappush(self._heap, (time, combatant.side, combatant.index, combatant))
+
+    def pop(self) -> Optional[Tuple[int, Combatant]]:
+        """取出下一个仍存活的行动者，没有时返回None"""
+        heap = self._heap
+        while heap:
+            time, _, _, combatant = heapq.heappop(heap)
+            if combatant.alive:
+                return time, combatant
+        return None
+
+
+class PartyBattleContext:
+    """多人战斗上下文"""
+
+    # 不支持快照，Boss的前瞻搜索在多人战斗中退回简单模式
+    supports_lookahead = False
+
+    def __init__(self, players: Sequence, enemies: Sequence, config: BattleConfig = None,
+                 output: Optional[OutputSink] = None, rng: Optional[BattleRNG] = None,
+                 player_policy: Optional[Callable] = None):
+        if not players or not enemies:
+            raise ValueError("双方都至少需要一名战斗者")
+        self.config = config or BattleConfig()
+        self.sides: Tuple[List[Combatant], List[Combatant]] = (
+            [Combatant(c, PLAYER_SIDE, i, player_policy) for i, c in enumerate(players)],
+            [Combatant(c, ENEMY_SIDE, i) for i, c in enumerate(enemies)],
+        )
+        self._combatants: Dict[int, Combatant] = {id(c.character): c for c in self.combatants()}
+        # 每方存活战斗者，倒下时与末尾交换后移除
+        self.alive: Tuple[List[Combatant], List[Combatant]] = ([], [])
+        for side in self.sides:
+            for combatant in side:
+                if combatant.character.is_alive():
+                    self._add_alive(combatant)
+
+        self._saved_bindings = [(c.character, c.character.rng, c.character.output)
+                                for c in self.combatants()]
+        for combatant in self.combatants():
+            combatant.character.battle_context = self
+        self.output = as_sink(output)
+        self.rng = rng or BattleRNG(self.config.seed)
+        # 玩家方决策函数专用的随机数流，见 BattleContext.policy_rng
+        self.policy_rng = policy_stream(self.rng)
+        for combatant in self.combatants():
+            combatant.character.output = self.output
+            combatant.character.rng = self.rng
+
+        self.events = EventBus()
+        self.turn_count = 0
+        self.current_phase = TurnPhase.BATTLE_START
+        self.log = ColumnarBattleLog()
+        self.rewards = BattleRewards()
+        self.fled = False
+        self.turn_limit_reached = False
+        self.actor: Optional[Combatant] = None  # 当前行动者
+
+    def combatants(self):
+        """双方所有战斗者（含已倒下的）"""
+        yield from self.sides[PLAYER_SIDE]
+        yield from self.sides[ENEMY_SIDE]
+
+    def _add_alive(self, combatant: Combatant):
+        alive = self.alive[combatant.side]
+        combatant.alive_pos = len(alive)
+        alive.append(combatant)
+
+    def remove_fallen(self, combatant: Combatant) -> bool:
+        """把生命值归零的战斗者移出存活索引，返回是否移除"""
+        if not combatant.alive or combatant.character.is_alive():
+            return False
+        alive = self.alive[combatant.side]
+        last = alive.pop()
+        if last is not combatant:
+            alive[combatant.alive_pos] = last
+            last.alive_pos = combatant.alive_pos
+        combatant.alive_pos = -1
+        if self.events.has_subscribers(CombatantDied):
+            self.events.publish(CombatantDied(combatant.character))
+        return True
+
+    def pick_target(self, actor: Combatant) -> Optional[Combatant]:
+        """从对方存活者中随机选择目标"""
+        opponents = self.alive[1 - actor.side]
+        if not opponents:
+            return None
+        if len(opponents) == 1:
+            return opponents[0]
+        return opponents[self.rng.randrange(len(opponents))]
+
+    def get_usable_skills(self, character=None) -> tuple:
+        """可用技能（默认为当前行动者），供玩家决策函数使用"""
+        return (character or self.actor.character).get_usable_skills()
+
+    def combatant_of(self, character) -> Combatant:
+        return self._combatants[id(character)]
+
+    def set_defending(self, character):
+        """战斗者进入防御姿态，到其下次行动前受到的伤害减半"""
+        self.combatant_of(character).defending = True
+
+    def inflict_status(self, source, target, status: str):
+        """技能结果标志中的战斗状态：stun 使目标跳过下一次行动，并发布StatusApplied事件"""
+        if status == "stun":
+            self.combatant_of(target).stunned = True
+        if self.events.has_subscribers(StatusApplied):
+            self.events.publish(StatusApplied(source, target, status, 1))
+
+    def log_event(self, phase: TurnPhase, actor: str, action: BattleAction, target: str,
+                  template: int, args: Tuple[Any, ...] = (), damage: int = 0,
+                  heal: int = 0, effect: Optional[str] = None) -> int:
+        """按模板记录一条日志，只有需要显示时才渲染消息文本"""
+        index = self.log.append(self.turn_count, phase, actor, action, target,
+                                template, args, damage, heal, effect)
+        if self.config.show_detailed_log and self.output.enabled:
+            self.output.write(self.log.render(index), turn=self.turn_count, actor=actor,
+                              action=action.value, target=target, damage=damage, heal=heal)
+        return index
+
+    # 状态效果结算日志与1对1战斗相同
+    log_status_ticks = BattleContext.log_status_ticks
+
+    def status_applied(self, target, effect):
+        """StatusManager 成功施加（或刷新/叠加）状态效果后调用，发布StatusApplied事件"""
+        if self.events.has_subscribers(StatusApplied):
+            source = self.actor.character if self.actor is not None else None
+            self.events.publish(StatusApplied(source, target, effect.name,
+                                              effect.remaining_duration, effect))
+
+    def is_battle_over(self) -> bool:
+        return (self.fled or self.turn_limit_reached
+                or not self.alive[PLAYER_SIDE] or not self.alive[ENEMY_SIDE])
+
+    def get_battle_result(self) -> str:
+        if self.fled:
+            return "flee"
+        elif not self.alive[PLAYER_SIDE]:
+            return "defeat"
+        elif not self.alive[ENEMY_SIDE]:
+            return "victory"
+        elif self.turn_limit_reached:
+            return "draw"
+        return "ongoing"
+
+    def release_combatants(self):
+        """战斗结束后恢复所有角色原有的随机数流和输出接口"""
+        for character, rng, output in self._saved_bindings:
+            character.rng = rng
+            character.output = output
+            character.battle_context = None
+
+
+class PartyBattleEngine(ActionExecutor):
+    """多人战斗引擎（行动结算与1对1战斗共用 actions.ActionExecutor）"""
+
+    def __init__(self, players: Sequence, enemies: Sequence, config: BattleConfig = None,
+                 player_policy: Optional[Callable[[PartyBattleContext], int]] = None,
+                 output: Optional[OutputSink] = None, rng: Optional[BattleRNG] = None):
+        """
+        Args:
+            players: 玩家方角色
+            enemies: 敌方角色
+            player_policy: 玩家方决策函数，返回与战斗菜单一致的行动编号
+            output: 战斗文本输出接口
+            rng: 战斗随机数流，为None时按config.seed创建
+        """
+        if player_policy is None:
+            raise ValueError("多人战斗需要提供player_policy")
+        self.context = PartyBattleContext(players, enemies, config, output, rng, player_policy)
+        self.scheduler = InitiativeScheduler()
+
+    def run(self, include_log: bool = True) -> Tuple[BattleResult, Dict[str, Any]]:
+        """运行到战斗结束，返回战斗结果和战斗摘要"""
+        context = self.context
+        scheduler = self.scheduler
+        for side in context.alive:
+            for combatant in side:
+                scheduler.schedule(combatant, combatant.interval)
+
+        output = context.output
+        while not context.is_battle_over():
+            entry = scheduler.pop()
+            if entry is None:
+                break
+            time, actor = entry
+            round_number = -(-time // ROUND_TICKS)
+            if round_number > context.turn_count:
+                if round_number > context.config.turn_limit:
+                    context.turn_limit_reached = True
+                    break
+                context.turn_count = round_number
+                if context.events.has_subscribers(TurnStarted):
+                    context.events.publish(TurnStarted(round_number))
+
+            self._take_turn(actor)
+            if actor.alive:
+                scheduler.schedule(actor, time + actor.interval)
+            output.flush()
+        output.flush()
+
+        result = context.get_battle_result()
+        self._process_battle_result(result)
+        context.release_combatants()
+        return BattleResult(result), self.get_battle_summary(include_log)
+
+    def _take_turn(self, actor: Combatant):
+        """一名战斗者的行动：行动（或消耗眩晕）后结算自身状态效果与冷却"""
+        context = self.context
+        context.actor = actor
+        actor.defending = False
+        character = actor.character
+
+        if actor.stunned:
+            actor.stunned = False
+            if context.output.enabled:
+                context.output(f"\n💫 {character.name}被眩晕，无法行动！")
+        elif actor.side == PLAYER_SIDE:
+            context.current_phase = TurnPhase.PLAYER_TURN
+            self._execute_player_action(actor, actor.policy(context))
+        else:
+            context.current_phase = TurnPhase.ENEMY_TURN
+            self._execute_enemy_action(actor)
+
+        results = character.update_status_effects()
+        if results:
+            context.log_status_ticks(character, results)
+        context.remove_fallen(actor)
+
+    def _execute_player_action(self, actor: Combatant, action_choice: int):
+        """执行玩家方行动，编号含义与1对1战斗菜单一致"""
+        context = self.context
+        player = actor.character
+        kind, skill = self._resolve_choice(action_choice, context.get_usable_skills(player))
+        if kind not in TARGETED_ACTIONS:
+            self._perform_player_action(player, kind, skill, None, False)
+            return
+
+        target = context.pick_target(actor)
+        self._perform_player_action(player, kind, skill, target.character, target.defending)
+        context.remove_fallen(target)
+
+    def _execute_enemy_action(self, actor: Combatant):
+        """执行敌方行动：有AI的敌人选择技能或攻击，否则普通攻击"""
+        context = self.context
+        enemy = actor.character
+        target = context.pick_target(actor)
+        player = target.character
+
+        if actor.has_ai:
+            action = enemy.select_action(player)
+            self._perform_enemy_action(enemy, player, target.defending, action)
+        else:
+            self._perform_attack(enemy, player, target.defending, TurnPhase.ENEMY_TURN)
+        context.remove_fallen(target)
+
+    def _process_battle_result(self, result: str):
+        """胜利时每名存活的玩家方角色获得全部敌人的经验"""
+        if result != "victory":
+            return
+        context = self.context
+        enemies = [c.character for c in context.sides[ENEMY_SIDE]]
+        context.rewards.experience = sum(enemy.level * 50 for enemy in enemies)
+        context.rewards.gold = sum(enemy.level * 10 for enemy in enemies)
+        defeated_boss = any(getattr(enemy, 'is_floor_boss', False) for enemy in enemies)
+        for combatant in context.alive[PLAYER_SIDE]:
+            player = combatant.character
+            player.gain_experience(context.rewards.experience)
+            if defeated_boss and hasattr(player, 'defeated_bosses'):
+                player.defeated_bosses.add(getattr(player, 'current_floor', 1))
+
+    def get_battle_summary(self, include_log: bool = True) -> Dict[str, Any]:
+        """获取战斗摘要，include_log为False时省略逐条日志"""
+        context = self.context
+        summary = {
+            "result": context.get_battle_result(),
+            "turns": context.turn_count,
+            "survivors": {
+                "players": [c.character.name for c in context.sides[PLAYER_SIDE] if c.alive],
+                "enemies": [c.character.name for c in context.sides[ENEMY_SIDE] if c.alive],
+            },
+            "rewards": {
+                "experience": context.rewards.experience,
+                "gold": context.rewards.gold,
+                "items": context.rewards.items
+            }
+        }
+        if include_log:
+            summary["log"] = context.log.to_dicts()
+        return summary
+
+
+def run_party_battle(players: Sequence, enemies: Sequence, policy: Callable,
+                     config: BattleConfig = None, output: Optional[OutputSink] = None,
+                     rng: Optional[BattleRNG] = None,
+                     include_log: bool = True) -> Tuple[BattleResult, Dict[str, Any]]:
+    """运行一场无头多人战斗，默认静默并关闭详细日志"""
+    from output_sink import NULL_SINK
+    if config is None:
+        config = BattleConfig(show_detailed_log=False)
+    engine = PartyBattleEngine(players, enemies, config, policy,
+                               NULL_SINK if output is None else output, rng)
+    return engine.run(include_log)
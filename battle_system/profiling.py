@@ -0,0 +1,201 @@
+"""战斗阶段计时 - 按阶段统计耗时直方图，定位慢战斗的时间花在哪里
+
+通过 BattleConfig(profile=True) 开启。开启时引擎在实例上用计时包装替换各阶段方法，
+关闭时不做任何替换，因此不开启时没有额外开销。
+
+阶段（包含关系：turn 包含其余阶段，player_action 包含 equipment 与 logging）：
+    turn           - 一个完整回合（异步引擎为 _process_turn_async，含等待玩家决策的时间）
+    next_turn      - 回合开始（BattleContext.next_turn：回合数递增、重置防御并发布 TurnStarted）
+    player_policy  - 无头模式的玩家决策函数
+    player_action  - 执行玩家行动
+    enemy_turn     - 敌人回合
+    enemy_ai       - 敌人AI选择行动（select_action，含Boss前瞻搜索；推演不计入其他阶段）
+    equipment      - 装备命中特效
+    end_turn       - 回合结束时双方 update_status_effects（StatusManager 结算全部状态效果并写入日志）
+    logging        - 写入战斗日志
+每场战斗结束时，本场统计会合并到进程级统计 PROCESS_PROFILE 中。
+"""
+
+import time
+from typing import Any, Callable, Dict, Optional
+
+# 直方图按 2 的幂划分纳秒耗时，第 i 个桶统计 [2^(i-1), 2^i) 纳秒
+BUCKET_COUNT = 48
+
+
+class PhaseStats:
+    """单个阶段的耗时统计"""
+
+    __slots__ = ("count", "total_ns", "min_ns", "max_ns", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+        self.buckets = [0] * BUCKET_COUNT
+
+    def add(self, elapsed_ns: int):
+        if self.count == 0 or elapsed_ns < self.min_ns:
+            self.min_ns = elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        self.count += 1
+        self.total_ns += elapsed_ns
+        self.buckets[min(elapsed_ns.bit_length(), BUCKET_COUNT - 1)] += 1
+
+    def merge(self, other: "PhaseStats"):
+        if other.count == 0:
+            return
+        if self.count == 0 or other.min_ns < self.min_ns:
+            self.min_ns = other.min_ns
+        self.max_ns = max(self.max_ns, other.max_ns)
+        self.count += other.count
+        self.total_ns += other.total_ns
+        for i, value in enumerate(other.buckets):
+            self.buckets[i] += value
+
+    def percentile_ns(self, pct: float) -> int:
+        """按直方图估计的百分位数（返回所在桶的上界）"""
+        if self.count == 0:
+            return 0
+        rank = self.count * pct / 100
+        seen = 0
+        for i, value in enumerate(self.buckets):
+            seen += value
+            if seen >= rank:
+                return min(1 << i, self.max_ns)
+        return self.max_ns
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_ms": self.total_ns / 1e6,
+            "mean_us": self.total_ns / self.count / 1e3 if self.count else 0.0,
+            "min_us": self.min_ns / 1e3,
+            "max_us": self.max_ns / 1e3,
+            "p50_us": self.percentile_ns(50) / 1e3,
+            "p90_us": self.percentile_ns(90) / 1e3,
+            "p99_us": self.percentile_ns(99) / 1e3,
+            "histogram": {f"<{1 << i}ns": value for i, value in enumerate(self.buckets) if value},
+        }
+
+
+class BattleProfiler:
+    """按阶段汇总耗时"""
+
+    def __init__(self):
+        self.phases: Dict[str, PhaseStats] = {}
+        # 大于0时计时包装直接调用原函数（SearchPattern 推演期间暂停，推演耗时只计入 enemy_ai）
+        self.paused = 0
+
+    def phase(self, name: str) -> PhaseStats:
+        stats = self.phases.get(name)
+        if stats is None:
+            stats = self.phases[name] = PhaseStats()
+        return stats
+
+    def wrap(self, name: str, func: Callable) -> Callable:
+        """返回对 func 计时并记入阶段 name 的包装函数"""
+        stats = self.phase(name)
+        clock = time.perf_counter_ns
+
+        def timed(*args, **kwargs):
+            if self.paused:
+                return func(*args, **kwargs)
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stats.add(clock() - start)
+        return timed
+
+    def wrap_async(self, name: str, func: Callable) -> Callable:
+        """wrap 的协程版本：计时到 await 完成为止"""
+        stats = self.phase(name)
+        clock = time.perf_counter_ns
+
+        async def timed(*args, **kwargs):
+            if self.paused:
+                return await func(*args, **kwargs)
+            start = clock()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                stats.add(clock() - start)
+        return timed
+
+    def merge(self, other: "BattleProfiler"):
+        for name, stats in other.phases.items():
+            self.phase(name).merge(stats)
+
+    def reset(self):
+        self.phases.clear()
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """可JSON序列化的统计结果"""
+        return {name: stats.to_dict() for name, stats in self.phases.items()}
+
+    def format_report(self) -> str:
+        """文本表格形式的统计结果（按总耗时降序）"""
+        # 表头中文字符占两列，宽度相应减少
+        lines = [f"{'阶段':<14}{'次数':>6}{'总计ms':>8}{'平均us':>8}{'p50us':>10}{'p99us':>10}{'最大us':>8}"]
+        for name, stats in sorted(self.phases.items(), key=lambda item: -item[1].total_ns):
+            data = stats.to_dict()
+            lines.append(f"{name:<16}{data['count']:>8}{data['total_ms']:>10.2f}{data['mean_us']:>10.1f}"
+                         f"{data['p50_us']:>10.1f}{data['p99_us']:>10.1f}{data['max_us']:>10.1f}")
+        return "\n".join(lines)
+
+
+# 本进程内所有开启计时的战斗的累计统计
+PROCESS_PROFILE = BattleProfiler()
+
+# (阶段名, 引擎方法名)
+ENGINE_PHASES = (
+    ("turn", "_process_turn"),
+    ("player_action", "_apply_player_choice"),
+    ("enemy_turn", "_process_enemy_turn"),
+    ("enemy_ai", "_select_enemy_action"),
+    ("equipment", "_trigger_on_hit"),
+    ("end_turn", "_end_turn"),
+)
+
+# (阶段名, 异步引擎的协程方法名)
+ASYNC_ENGINE_PHASES = (
+    ("turn", "_process_turn_async"),
+)
+
+# (阶段名, 上下文方法名)
+CONTEXT_PHASES = (
+    ("next_turn", "next_turn"),
+    ("logging", "log_event"),
+)
+
+
+def install(engine, profiler: Optional[BattleProfiler] = None) -> BattleProfiler:
+    """在引擎及其上下文实例上安装阶段计时，返回使用的统计器"""
+    profiler = profiler or BattleProfiler()
+    for name, attr in ENGINE_PHASES:
+        setattr(engine, attr, profiler.wrap(name, getattr(engine, attr)))
+    for name, attr in ASYNC_ENGINE_PHASES:
+        if hasattr(engine, attr):
+            setattr(engine, attr, profiler.wrap_async(name, getattr(engine, attr)))
+    for name, attr in CONTEXT_PHASES:
+        setattr(engine.context, attr, profiler.wrap(name, getattr(engine.context, attr)))
+    engine.context.profiler = profiler
+    if engine.player_policy is not None:
+        policy = engine.player_policy
+        timed_policy = profiler.wrap("player_policy", policy)
+        # 保留决策函数上的标记（如快进判断使用的 always_attacks）
+        timed_policy.__dict__.update(getattr(policy, "__dict__", {}))
+        engine.player_policy = timed_policy
+    return profiler
+
+
+def process_report() -> Dict[str, Dict[str, Any]]:
+    """进程级累计统计"""
+    return PROCESS_PROFILE.report()
+
+
+def reset_process_profile():
+    PROCESS_PROFILE.reset()
@@ -0,0 +1,283 @@
+"""战斗录像 - 记录种子、初始状态和双方行动序列，并能以无头模式快速重放
+
+录像只保存很少的数据（可直接存为JSON附在问题报告中）：
+    - 战斗随机数流的种子与派生路径
+    - 战斗配置
+    - 双方的构建方式（PlayerBuild / EnemySpec）与开战时的状态
+    - 玩家每回合的行动编号与敌人每回合选择的行动
+    - 战斗结果，用于重放时校验
+重放时敌人仍会调用 select_action（保证随机数流和冷却与录制时一致），
+若新版本选出的行动与录像不同，则按录像执行并记录为差异。
+玩家决策函数使用独立的 context.policy_rng，重放时不调用决策函数也不会使战斗随机数流错位。
+check_replay_roundtrip() 可以检查"录制 → JSON → 重放"是否逐位一致。
+"""
+
+import json
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from output_sink import NULL_SINK, OutputSink
+from .battle_engine import BattleEngine
+from .battle_types import BattleConfig, BattleResult
+from .rng import BattleRNG
+from .simulation import EnemySpec, PlayerBuild
+
+REPLAY_VERSION = 1
+
+
+def snapshot_combatant(character) -> Dict[str, Any]:
+    """记录角色开战时的状态（可JSON序列化）"""
+    return {
+        "name": character.name,
+        "level": character.level,
+        "hp": character.hp,
+        "mp": character.mp,
+        "max_hp": character.max_hp,
+        "max_mp": character.max_mp,
+        "attack": character.attack,
+        "defense": character.defense,
+        "spell_power": character.spell_power,
+        "cooldowns": {skill.name: skill.current_cooldown for skill in character.skills},
+    }
+
+
+def apply_combatant_state(character, state: Dict[str, Any]) -> List[str]:
+    """把录像中的状态写回新建的角色，返回与录像不一致的属性说明"""
+    differences = []
+    for stat in ("level", "max_hp", "max_mp", "attack", "defense", "spell_power"):
+        current = getattr(character, stat)
+        if stat in state and current != state[stat]:
+            differences.append(f"{character.name} 的 {stat} 为 {current}，录像中为 {state[stat]}")
+    character.hp = state["hp"]
+    character.mp = state["mp"]
+    cooldowns = state.get("cooldowns", {})
+    for skill in character.skills:
+        if skill.name in cooldowns:
+            skill.current_cooldown = cooldowns[skill.name]
+    return differences
+
+
+def encode_enemy_action(enemy, action: Dict[str, Any]) -> Dict[str, Any]:
+    """把敌人的行动字典转换为可序列化的形式"""
+    if action.get("type") == "skill":
+        target = "self" if action.get("target") is enemy else "player"
+        return {"type": "skill", "skill": action["skill"].name, "target": target}
+    return {"type": action.get("type", "attack")}
+
+
+def decode_enemy_action(enemy, player, encoded: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """把录像中的敌人行动还原为行动字典，找不到对应技能时返回None"""
+    if encoded["type"] == "skill":
+        skill = next((s for s in enemy.skills if s.name == encoded["skill"]), None)
+        if skill is None:
+            return None
+        target = enemy if encoded.get("target") == "self" else player
+        return {"type": "skill", "skill": skill, "target": target}
+    return {"type": "attack", "target": player, "damage": enemy.attack}
+
+
+@dataclass
+class BattleReplay:
+    """一场战斗的录像"""
+    seed: int
+    spawn_key: Tuple[int, ...]
+    config: Dict[str, Any]
+    player_build: Optional[Dict[str, Any]]
+    enemy_spec: Optional[Dict[str, Any]]
+    player_state: Dict[str, Any]
+    enemy_state: Dict[str, Any]
+    player_actions: List[int] = field(default_factory=list)
+    enemy_actions: List[Dict[str, Any]] = field(default_factory=list)
+    outcome: Dict[str, Any] = field(default_factory=dict)
+    version: int = REPLAY_VERSION
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["spawn_key"] = list(self.spawn_key)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BattleReplay":
+        data = dict(data)
+        data["spawn_key"] = tuple(data.get("spawn_key", ()))
+        return cls(**data)
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str) -> "BattleReplay":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+class BattleRecorder:
+    """战斗录像记录器
+
+    必须在战斗开始前创建，创建时即挂到引擎上并记录开战状态：
+
+        engine = BattleEngine(player, enemy, config, player_policy=policy)
+        recorder = BattleRecorder(engine, build, spec)
+        engine.run_headless()
+        recorder.replay.save("battle.json")
+
+    build/spec 为None时录像无法自行重建角色，重放时需要传入新建的角色。
+    """
+
+    def __init__(self, engine: BattleEngine, build: Optional[PlayerBuild] = None,
+                 spec: Optional[EnemySpec] = None):
+        context = engine.context
+        rng = context.rng
+        self.replay = BattleReplay(
+            seed=rng.root_seed,
+            spawn_key=tuple(rng.spawn_key),
+            config=asdict(context.config),
+            player_build=asdict(build) if build is not None else None,
+            enemy_spec=asdict(spec) if spec is not None else None,
+            player_state=snapshot_combatant(context.player),
+            enemy_state=snapshot_combatant(context.enemy),
+        )
+        engine.recorder = self
+
+    def record_player_action(self, action_choice: int):
+        self.replay.player_actions.append(action_choice)
+
+    def record_enemy_action(self, enemy, action: Dict[str, Any]):
+        self.replay.enemy_actions.append(encode_enemy_action(enemy, action))
+
+    def record_result(self, context, result: str):
+        self.replay.outcome = {
+            "result": result,
+            "turns": context.turn_count,
+            "player_hp": context.player.hp,
+            "enemy_hp": context.enemy.hp,
+        }
+
+
+@dataclass
+class ReplayResult:
+    """重放结果"""
+    result: BattleResult
+    summary: Dict[str, Any]
+    divergences: List[str] = field(default_factory=list)
+
+    @property
+    def matches(self) -> bool:
+        """重放过程和结果是否与录像完全一致"""
+        return not self.divergences
+
+
+class ReplayEngine(BattleEngine):
+    """按录像中的行动序列执行战斗的引擎"""
+
+    def __init__(self, replay: BattleReplay, player, enemy, output: Optional[OutputSink] = None):
+        config = BattleConfig(**replay.config)
+        rng = BattleRNG(replay.seed, tuple(replay.spawn_key))
+        super().__init__(player, enemy, config, player_policy=self._next_player_action,
+                         output=output, rng=rng)
+        self.replay = replay
+        self.divergences: List[str] = []
+        self._player_index = 0
+        self._enemy_index = 0
+
+    def _next_player_action(self, context) -> int:
+        actions = self.replay.player_actions
+        if self._player_index >= len(actions):
+            self.divergences.append(f"第{context.turn_count}回合：录像中已没有玩家行动，改为普通攻击")
+            return 1
+        action_choice = actions[self._player_index]
+        self._player_index += 1
+        return action_choice
+
+    def _select_enemy_action(self, enemy, player) -> Dict[str, Any]:
+        # 仍然调用AI，使随机数流与技能冷却保持与录制时相同的推进
+        action = super()._select_enemy_action(enemy, player)
+        actions = self.replay.enemy_actions
+        turn = self.context.turn_count
+        if self._enemy_index >= len(actions):
+            self.divergences.append(f"第{turn}回合：录像中已没有敌人行动")
+            return action
+        expected = actions[self._enemy_index]
+        self._enemy_index += 1
+
+        if encode_enemy_action(enemy, action) == expected:
+            return action
+        self.divergences.append(f"第{turn}回合：敌人选择了 {encode_enemy_action(enemy, action)}，录像中为 {expected}")
+        recorded = decode_enemy_action(enemy, player, expected)
+        return recorded if recorded is not None else action
+
+
+def replay_battle(replay: BattleReplay, player=None, enemy=None,
+                  output: OutputSink = NULL_SINK) -> ReplayResult:
+    """以无头模式重放一场录像
+
+    Args:
+        replay: 战斗录像
+        player: 新建的玩家角色，为None时按录像中的PlayerBuild重建
+        enemy: 新建的敌人，为None时按录像中的EnemySpec重建
+        output: 输出接口，默认静默
+
+    Returns:
+        重放结果，divergences 中列出与录像不一致之处
+    """
+    if player is None:
+        if replay.player_build is None:
+            raise ValueError("录像中没有玩家构建信息，需要传入player")
+        build = dict(replay.player_build)
+        build["equipment"] = tuple(build.get("equipment", ()))
+        player = PlayerBuild(**build).build(NULL_SINK)
+    if enemy is None:
+        if replay.enemy_spec is None:
+            raise ValueError("录像中没有敌人构建信息，需要传入enemy")
+        enemy = EnemySpec(**replay.enemy_spec).build()
+
+    divergences = apply_combatant_state(player, replay.player_state)
+    divergences += apply_combatant_state(enemy, replay.enemy_state)
+
+    engine = ReplayEngine(replay, player, enemy, output)
+    result, summary = engine.run_headless(include_log=False)
+    divergences += engine.divergences
+
+    if engine._player_index < len(replay.player_actions):
+        divergences.append(f"战斗提前结束，还有 {len(replay.player_actions) - engine._player_index} 个玩家行动未执行")
+    outcome = {
+        "result": result.value,
+        "turns": summary["turns"],
+        "player_hp": player.hp,
+        "enemy_hp": enemy.hp,
+    }
+    for key, expected in replay.outcome.items():
+        if outcome.get(key) != expected:
+            divergences.append(f"结果 {key} 为 {outcome.get(key)}，录像中为 {expected}")
+    return ReplayResult(result, summary, divergences)
+
+
+def verify_replays(replays: Iterable[BattleReplay]) -> List[Tuple[int, List[str]]]:
+    """批量重放录像，返回不一致的 (序号, 差异列表)"""
+    failures = []
+    for index, replay in enumerate(replays):
+        replayed = replay_battle(replay)
+        if not replayed.matches:
+            failures.append((index, replayed.divergences))
+    return failures
+
+
+def check_replay_roundtrip(build: PlayerBuild, spec: EnemySpec, policy: Callable, seeds: Iterable[int],
+                           config: Optional[BattleConfig] = None) -> List[Tuple[int, List[str]]]:
+    """按每个种子录制一场战斗，经JSON往返后重放，返回不一致的 (种子, 差异列表)
+
+    policy 可以是随机决策函数（如 random_policy），用于检查重放不依赖决策函数的随机取值。
+    """
+    config = config or BattleConfig(show_detailed_log=False, allow_flee=False)
+    failures = []
+    for seed in seeds:
+        engine = BattleEngine(build.build(NULL_SINK), spec.build(), replace(config, seed=seed),
+                              player_policy=policy, output=NULL_SINK)
+        recorder = BattleRecorder(engine, build, spec)
+        engine.run_headless(include_log=False)
+        replay = BattleReplay.from_dict(json.loads(json.dumps(recorder.replay.to_dict())))
+        replayed = replay_battle(replay)
+        if not replayed.matches:
+            failures.append((seed, replayed.divergences))
+    return failures
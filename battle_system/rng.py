@@ -0,0 +1,55 @@
+"""战斗随机数流 - 每场战斗独立、可复现、可派生子流"""
+
+import hashlib
+import random
+from typing import List, Optional, Tuple
+
+
+def derive_seed(master_seed: int, *path: int) -> int:
+    """由主种子和编号路径派生出独立的64位种子"""
+    text = ":".join(str(part) for part in (master_seed,) + path)
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "little")
+
+
+class BattleRNG(random.Random):
+    """战斗专用随机数生成器
+
+    与 random.Random 接口一致。seed 记录了实际使用的种子（未指定时随机生成），
+    因此任何一场战斗都可以凭 seed 逐位复现。spawn() 按派生路径生成互不相关的子流，
+    供并行模拟的各个工作进程或各场战斗使用，不会共享或关联随机状态。
+    """
+
+    def __init__(self, seed: Optional[int] = None, spawn_key: Tuple[int, ...] = ()):
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(64)
+        self.root_seed = seed
+        self.spawn_key = spawn_key
+        self.seed_value = derive_seed(seed, *spawn_key) if spawn_key else seed
+        self._spawned = 0
+        super().__init__(self.seed_value)
+
+    @classmethod
+    def from_master(cls, master_seed: int, *path: int) -> "BattleRNG":
+        """直接按派生路径创建子流，等价于逐级 spawn"""
+        return cls(master_seed, tuple(path))
+
+    def spawn(self, count: int) -> List["BattleRNG"]:
+        """派生 count 个新的独立子流"""
+        children = [BattleRNG(self.root_seed, self.spawn_key + (self._spawned + i,))
+                    for i in range(count)]
+        self._spawned += count
+        return children
+
+
+# 玩家决策函数专用随机数流在派生路径上的编号（负数，不会与 spawn() 派生的子流冲突）
+POLICY_STREAM = -2
+
+
+def policy_stream(rng: random.Random) -> random.Random:
+    """由战斗随机数流派生玩家决策函数专用的随机数流，不消耗战斗随机数流
+
+    决策函数从这里取随机数，录像重放时（直接使用录下的行动编号）敌人AI、技能和装备的随机判定不会错位。
+    """
+    if isinstance(rng, BattleRNG):
+        return BattleRNG(rng.root_seed, rng.spawn_key + (POLICY_STREAM,))
+    return random.Random(hash(rng.getstate()))
@@ -0,0 +1,256 @@
+"""蒙特卡洛战斗模拟 - 在进程池中批量运行无头战斗并统计胜率
+
+每场战斗使用由主种子、对局编号和战斗编号派生的独立随机数流，
+并按编号汇总结果，因此无论使用多少个工作进程，统计结果都完全一致。
+"""
+
+import math
+import os
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from output_sink import NULL_SINK, OutputSink
+from .battle_types import BattleConfig, BattleResult
+from .headless import PlayerPolicy, run_headless_battle, skill_first_policy
+from .rng import BattleRNG
+
+# 95%置信区间对应的正态分位数
+Z_95 = 1.959964
+
+# 每个进程任务包含的战斗场数
+DEFAULT_CHUNK_SIZE = 64
+
+HP_PERCENTILES = (10, 25, 50, 75, 90)
+
+
+@dataclass(frozen=True)
+class PlayerBuild:
+    """玩家配置：职业、等级与装备（装备为 characters.equipments.mage 中的类名）"""
+    character_class: str = "MAGE"
+    level: int = 1
+    equipment: Tuple[str, ...] = ()
+    name: str = "模拟玩家"
+
+    def build(self, output: Optional[OutputSink] = None):
+        """创建满状态的玩家角色"""
+        from characters.base_character import CharacterClass
+        from characters.player_character import PlayerCharacter
+        from characters.equipments import mage
+
+        player = PlayerCharacter(self.name, CharacterClass[self.character_class], output=output)
+        while player.level < self.level:
+            player.level_up()
+        player.experience = 0
+        for equipment_name in self.equipment:
+            player.equip(getattr(mage, equipment_name)())
+        player.hp = player.max_hp
+        player.mp = player.max_mp
+        return player
+
+
+@dataclass(frozen=True)
+class EnemySpec:
+    """敌人配置：kind为 "lothir"（key为生物名）或 "boss"（key为层数）"""
+    kind: str
+    key: Any
+    level: Optional[int] = None
+
+    @property
+    def label(self) -> str:
+        if self.kind == "boss":
+            return f"boss:{self.key}"
+        level_text = f"@{self.level}" if self.level is not None else ""
+        return f"{self.kind}:{self.key}{level_text}"
+
+    def build(self):
+        """创建全新的敌人实例"""
+        if self.kind == "lothir":
+            from enemy.lothir import get_creature_by_name
+            enemy = get_creature_by_name(self.key, self.level)
+            if enemy is None:
+                raise KeyError(f"未知的洛希尔生物: {self.key}")
+            return enemy
+        elif self.kind == "boss":
+            from enemy.bosses.boss_manager import BossManager
+            boss = BossManager().get_boss(self.key)
+            if boss is None:
+                raise KeyError(f"未知的层主: {self.key}")
+            return boss
+        raise ValueError(f"未知的敌人类型: {self.kind}")
+
+
+@dataclass
+class MatchupStats:
+    """单个对局的统计结果"""
+    enemy: str
+    battles: int = 0
+    wins: int = 0
+    losses: int = 0
+    draws: int = 0
+    win_rate: float = 0.0
+    win_rate_ci: Tuple[float, float] = (0.0, 0.0)
+    mean_turns: float = 0.0
+    turns_ci: Tuple[float, float] = (0.0, 0.0)
+    mean_hp_remaining: float = 0.0
+    hp_remaining_ci: Tuple[float, float] = (0.0, 0.0)
+    hp_remaining_percentiles: Dict[int, float] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+def roster_specs(lothir_level: Optional[int] = None) -> List[EnemySpec]:
+    """整个敌人名册：所有洛希尔生物与全部层主"""
+    from enemy.lothir import ALL_LOTHIR_CREATURES
+    from enemy.bosses.boss_manager import BossManager
+
+    specs = [EnemySpec("lothir", name, lothir_level) for name in ALL_LOTHIR_CREATURES]
+    specs.extend(EnemySpec("boss", floor) for floor in sorted(BossManager().bosses))
+    return specs
+
+
+def wilson_interval(successes: int, n: int, z: float = Z_95) -> Tuple[float, float]:
+    """二项比例的Wilson置信区间"""
+    if n == 0:
+        return (0.0, 0.0)
+    p = successes / n
+    denom = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return (max(0.0, centre - half), min(1.0, centre + half))
+
+
+def mean_interval(values: Sequence[float], z: float = Z_95) -> Tuple[float, Tuple[float, float]]:
+    """样本均值及其正态近似置信区间"""
+    if not values:
+        return 0.0, (0.0, 0.0)
+    mean = statistics.fmean(values)
+    if len(values) < 2:
+        return mean, (mean, mean)
+    half = z * statistics.stdev(values) / math.sqrt(len(values))
+    return mean, (mean - half, mean + half)
+
+
+def _percentile(sorted_values: Sequence[float], pct: int) -> float:
+    """线性插值百分位数"""
+    if not sorted_values:
+        return 0.0
+    pos = (len(sorted_values) - 1) * pct / 100
+    low = int(pos)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (pos - low)
+
+
+def _run_chunk(build: PlayerBuild, spec: EnemySpec, policy: PlayerPolicy,
+               config: BattleConfig, master_seed: int, matchup_index: int,
+               start: int, count: int) -> List[Tuple[str, int, float]]:
+    """在工作进程中运行一段连续编号的战斗，返回 (结果, 回合数, 剩余生命比例)"""
+    outcomes = []
+    for battle_index in range(start, start + count):
+        player = build.build(NULL_SINK)
+        enemy = spec.build()
+        rng = BattleRNG.from_master(master_seed, matchup_index, battle_index)
+        result, summary = run_headless_battle(player, enemy, policy, config, rng=rng,
+                                              include_log=False)
+        hp_ratio = player.hp / player.max_hp if player.max_hp > 0 else 0.0
+        outcomes.append((result.value, summary["turns"], hp_ratio))
+    return outcomes
+
+
+def _summarize(label: str, outcomes: List[Tuple[str, int, float]]) -> MatchupStats:
+    """把逐场结果汇总为统计量"""
+    stats = MatchupStats(enemy=label, battles=len(outcomes))
+    stats.wins = sum(1 for result, _, _ in outcomes if result == BattleResult.VICTORY.value)
+    stats.losses = sum(1 for result, _, _ in outcomes if result == BattleResult.DEFEAT.value)
+    stats.draws = sum(1 for result, _, _ in outcomes if result == BattleResult.DRAW.value)
+    if stats.battles:
+        stats.win_rate = stats.wins / stats.battles
+    stats.win_rate_ci = wilson_interval(stats.wins, stats.battles)
+    stats.mean_turns, stats.turns_ci = mean_interval([turns for _, turns, _ in outcomes])
+    hp_values = sorted(hp for _, _, hp in outcomes)
+    stats.mean_hp_remaining, stats.hp_remaining_ci = mean_interval(hp_values)
+    stats.hp_remaining_percentiles = {pct: _percentile(hp_values, pct) for pct in HP_PERCENTILES}
+    return stats
+
+
+def simulate_roster(build: PlayerBuild, enemies: Sequence[EnemySpec], battles: int = 1000,
+                    master_seed: int = 0, workers: Optional[int] = None,
+                    policy: PlayerPolicy = skill_first_policy,
+                    config: Optional[BattleConfig] = None,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[MatchupStats]:
+    """对每个敌人运行 battles 场战斗并统计
+
+    Args:
+        build: 玩家配置
+        enemies: 敌人配置列表
+        battles: 每个对局的战斗场数
+        master_seed: 主种子，相同主种子得到相同结果
+        workers: 工作进程数；1表示在当前进程内运行，None表示使用全部CPU
+        policy: 玩家决策函数（必须可被pickle，即模块级函数）
+        config: 战斗配置
+        chunk_size: 每个进程任务的战斗场数
+
+    Returns:
+        与enemies顺序一致的统计结果列表
+    """
+    if config is None:
+        config = BattleConfig(allow_flee=False, show_detailed_log=False)
+
+    # 先确认每个敌人都能被创建，无法创建的对局直接记录错误
+    valid: List[int] = []
+    errors: Dict[int, str] = {}
+    for index, spec in enumerate(enemies):
+        try:
+            spec.build()
+            valid.append(index)
+        except Exception as e:
+            errors[index] = f"{type(e).__name__}: {e}"
+
+    tasks = [(index, start, min(chunk_size, battles - start))
+             for index in valid for start in range(0, battles, chunk_size)]
+    outcomes: Dict[int, List[Tuple[str, int, float]]] = {index: [] for index in valid}
+
+    if workers == 1:
+        for index, start, count in tasks:
+            outcomes[index].extend(_run_chunk(build, enemies[index], policy, config,
+                                              master_seed, index, start, count))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_run_chunk, build, enemies[index], policy, config,
+                                   master_seed, index, start, count)
+                       for index, start, count in tasks]
+            # 按提交顺序收集，保证与工作进程数无关
+            for (index, _, _), future in zip(tasks, futures):
+                outcomes[index].extend(future.result())
+
+    results = []
+    for index, spec in enumerate(enemies):
+        if index in errors:
+            results.append(MatchupStats(enemy=spec.label, error=errors[index]))
+        else:
+            results.append(_summarize(spec.label, outcomes[index]))
+    return results
+
+
+def simulate_matchup(build: PlayerBuild, enemy: EnemySpec, battles: int = 1000,
+                     master_seed: int = 0, workers: Optional[int] = None,
+                     policy: PlayerPolicy = skill_first_policy,
+                     config: Optional[BattleConfig] = None) -> MatchupStats:
+    """运行单个对局的蒙特卡洛模拟"""
+    return simulate_roster(build, [enemy], battles, master_seed, workers, policy, config)[0]
+
+
+if __name__ == "__main__":
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    for stats in simulate_roster(PlayerBuild("MAGE", level=5), roster_specs(), battles=200):
+        if stats.error:
+            print(f"{stats.enemy:<24} 无法创建: {stats.error}")
+        else:
+            low, high = stats.win_rate_ci
+            print(f"{stats.enemy:<24} 胜率 {stats.win_rate:6.1%} [{low:.1%}, {high:.1%}]  "
+                  f"平均回合 {stats.mean_turns:5.1f}  剩余生命中位数 {stats.hp_remaining_percentiles[50]:.0%}")
@@ -0,0 +1,345 @@
+"""向量化战斗内核 - 用NumPy数组一次模拟成千上万场只含普通攻击和持续伤害/治疗的战斗
+
+适用范围：玩家每回合普通攻击或防御，敌人为没有技能的普通敌人，没有装备特效。
+回合规则与 BattleEngine 完全一致：
+    1. 玩家行动（max(1, 攻击 - 防御)，或进入防御）
+    2. 若战斗未结束且未到回合上限，敌人攻击（玩家防御时伤害减半）
+    3. 同样条件下回合结束，先玩家后敌人，按 StatusManager 的结算顺序结算双方的状态效果
+
+状态效果以列的形式给出（StatusColumn：一方身上一种效果的剩余回合、层数和参数数组），
+支持状态表中带 compiled_tick 的效果（灼烧、中毒、持续治疗等），每回合的数值由
+状态表中的 amount 公式编译成的数组函数一次算出，与对象引擎逐个调用 on_tick 的结果相同。
+灼烧/中毒也可以直接用 BattleBatch 的 burn / poison 列给出。
+同一场中的效果应彼此不互斥（内核不检查互斥，cross_check 会报告不一致）。
+可用 cross_check() 与对象引擎逐场对照。
+
+依赖 numpy，仅在使用本模块时需要安装。
+"""
+
+import ast
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from status_effects import BurnEffect, PoisonEffect
+from .battle_types import BattleConfig, BattleResult
+
+# 与 BurnEffect / PoisonEffect 构造参数的默认值一致
+DEFAULT_BURN_DAMAGE = 10
+DEFAULT_POISON_PERCENT = 0.05
+
+# 状态公式中可以使用的战斗者属性
+FORMULA_FIELDS = ("hp", "max_hp", "attack", "defense")
+
+# 结果编码
+ONGOING = 0
+VICTORY = 1
+DEFEAT = 2
+DRAW = 3
+
+RESULT_NAMES = {
+    VICTORY: BattleResult.VICTORY.value,
+    DEFEAT: BattleResult.DEFEAT.value,
+    DRAW: BattleResult.DRAW.value,
+}
+
+
+@dataclass
+class StatusColumn:
+    """一批战斗中一方身上的一种状态效果（每场至多一个实例），长度均为N"""
+    side: str                                       # "player" 或 "enemy"
+    effect_class: type                              # 带 compiled_tick 的状态效果类
+    remaining: np.ndarray                           # 剩余回合，0表示该场没有这个效果
+    stacks: Optional[np.ndarray] = None             # 层数，默认1层
+    params: Optional[Dict[str, np.ndarray]] = None  # 公式参数，缺省时使用构造参数的默认值
+
+    def __post_init__(self):
+        if self.side not in ("player", "enemy"):
+            raise ValueError(f"未知的一方: {self.side}")
+        spec = getattr(self.effect_class, "compiled_tick", None)
+        # compiled_tick 会被继承，子类重写 on_tick 后表中的规则不再适用
+        if spec is None or self.effect_class.on_tick is not spec.on_tick:
+            raise ValueError(f"{self.effect_class.__name__} 不是只造成伤害/治疗的状态表效果")
+        count = len(self.remaining)
+        if self.stacks is None:
+            self.stacks = np.ones(count, dtype=np.int64)
+        self.params = dict(self.params or {})
+        defaults = self.effect_class()
+        for name in self.effect_class.compiled_tick.params:
+            if name not in self.params:
+                self.params[name] = np.full(count, getattr(defaults, name))
+
+
+@dataclass
+class BattleBatch:
+    """一批战斗的初始状态，所有字段均为长度N的数组（中毒比例为浮点，其余为整数）"""
+    player_hp: np.ndarray
+    player_max_hp: np.ndarray
+    player_attack: np.ndarray
+    player_defense: np.ndarray
+    enemy_hp: np.ndarray
+    enemy_max_hp: np.ndarray
+    enemy_attack: np.ndarray
+    enemy_defense: np.ndarray
+    player_burn: np.ndarray     # 灼烧剩余回合
+    player_poison: np.ndarray   # 中毒剩余回合
+    enemy_burn: np.ndarray
+    enemy_poison: np.ndarray
+    player_defends: np.ndarray  # 布尔数组：该场玩家每回合都防御而不攻击
+    player_burn_damage: np.ndarray = None     # 灼烧每回合伤害，默认与 BurnEffect 相同
+    player_poison_percent: np.ndarray = None  # 中毒每回合最大生命比例（浮点），默认与 PoisonEffect 相同
+    enemy_burn_damage: np.ndarray = None
+    enemy_poison_percent: np.ndarray = None
+    statuses: List[StatusColumn] = field(default_factory=list)  # 其他状态效果列
+
+    def __post_init__(self):
+        count = len(self.player_hp)
+        for name, default, dtype in (("player_burn_damage", DEFAULT_BURN_DAMAGE, np.int64),
+                                     ("enemy_burn_damage", DEFAULT_BURN_DAMAGE, np.int64),
+                                     ("player_poison_percent", DEFAULT_POISON_PERCENT, np.float64),
+                                     ("enemy_poison_percent", DEFAULT_POISON_PERCENT, np.float64)):
+            if getattr(self, name) is None:
+                setattr(self, name, np.full(count, default, dtype=dtype))
+
+    def __len__(self) -> int:
+        return len(self.player_hp)
+
+    @classmethod
+    def from_stats(cls, count: int, player: Dict[str, int], enemy: Dict[str, int],
+                   player_status: Optional[Dict[str, int]] = None,
+                   enemy_status: Optional[Dict[str, int]] = None,
+                   player_defends: bool = False,
+                   statuses: Sequence[StatusColumn] = ()) -> "BattleBatch":
+        """用同一组属性（标量或长度为count的序列）构造一批战斗
+
+        状态字典的键：burn / poison 为持续回合，burn_damage 为灼烧每回合伤害，
+        poison_percent 为中毒每回合最大生命比例。其他状态效果通过 statuses 给出。
+        """
+        def column(values: Dict[str, int], key: str, default=0, dtype=np.int64) -> np.ndarray:
+            return np.broadcast_to(np.asarray(values.get(key, default), dtype=dtype), (count,)).copy()
+
+        player_status = player_status or {}
+        enemy_status = enemy_status or {}
+        return cls(
+            player_hp=column(player, "hp", player.get("max_hp", 0)),
+            player_max_hp=column(player, "max_hp"),
+            player_attack=column(player, "attack"),
+            player_defense=column(player, "defense"),
+            enemy_hp=column(enemy, "hp", enemy.get("max_hp", 0)),
+            enemy_max_hp=column(enemy, "max_hp"),
+            enemy_attack=column(enemy, "attack"),
+            enemy_defense=column(enemy, "defense"),
+            player_burn=column(player_status, "burn"),
+            player_poison=column(player_status, "poison"),
+            enemy_burn=column(enemy_status, "burn"),
+            enemy_poison=column(enemy_status, "poison"),
+            player_defends=np.broadcast_to(np.asarray(player_defends, dtype=bool), (count,)).copy(),
+            player_burn_damage=column(player_status, "burn_damage", DEFAULT_BURN_DAMAGE),
+            player_poison_percent=column(player_status, "poison_percent", DEFAULT_POISON_PERCENT, np.float64),
+            enemy_burn_damage=column(enemy_status, "burn_damage", DEFAULT_BURN_DAMAGE),
+            enemy_poison_percent=column(enemy_status, "poison_percent", DEFAULT_POISON_PERCENT, np.float64),
+            statuses=list(statuses),
+        )
+
+    def status_columns(self) -> List[StatusColumn]:
+        """全部状态效果列：burn / poison 列在前，其后是 statuses"""
+        columns = []
+        for side in ("player", "enemy"):
+            columns.append(StatusColumn(side, BurnEffect, getattr(self, f"{side}_burn"), params={
+                "damage_per_turn": getattr(self, f"{side}_burn_damage").astype(np.int64)}))
+            columns.append(StatusColumn(side, PoisonEffect, getattr(self, f"{side}_poison"), params={
+                "percent_per_turn": getattr(self, f"{side}_poison_percent")}))
+        return columns + list(self.statuses)
+
+
+@dataclass
+class BatchOutcome:
+    """一批战斗的结果"""
+    result: np.ndarray     # 结果编码 VICTORY / DEFEAT / DRAW
+    turns: np.ndarray
+    player_hp: np.ndarray
+    enemy_hp: np.ndarray
+
+    def result_names(self) -> List[str]:
+        return [RESULT_NAMES[code] for code in self.result.tolist()]
+
+    def win_rate(self) -> float:
+        return float(np.mean(self.result == VICTORY)) if len(self.result) else 0.0
+
+
+def _to_int(values, rounding: Callable) -> np.ndarray:
+    values = np.asarray(values)
+    return rounding(values).astype(np.int64) if values.dtype.kind == "f" else values
+
+
+# 公式函数的数组版本，取整方式与 Python 内置函数一致
+FORMULA_FUNCTIONS = {
+    "int": lambda x: _to_int(x, np.trunc),
+    "round": lambda x: _to_int(x, np.rint),
+    "min": np.minimum,
+    "max": np.maximum,
+    "abs": np.abs,
+}
+
+
+class _StatusLane:
+    """内核中一列状态效果的工作数据：剩余回合和每回合数值的数组函数"""
+
+    __slots__ = ("player_side", "heal", "remaining", "formula", "arguments", "amount")
+
+    def __init__(self, column: StatusColumn, stats: Dict[str, np.ndarray]):
+        spec = column.effect_class.compiled_tick
+        names = {node.id for node in ast.walk(ast.parse(spec.formula, mode="eval"))
+                 if isinstance(node, ast.Name)}
+        unknown = names - {"stacks", *spec.params, *FORMULA_FIELDS, *FORMULA_FUNCTIONS}
+        if unknown:
+            raise ValueError(f"{column.effect_class.__name__} 的公式使用了内核没有的属性: {sorted(unknown)}")
+        self.player_side = column.side == "player"
+        self.heal = spec.effect == "heal"
+        self.remaining = column.remaining.astype(np.int64, copy=True)
+        self.formula = eval(f"lambda stacks, {', '.join(spec.params + FORMULA_FIELDS)}: {spec.formula}",
+                            dict(FORMULA_FUNCTIONS))
+        self.arguments = ([column.stacks] + [column.params[name] for name in spec.params]
+                          + [stats[name] for name in FORMULA_FIELDS[1:]])
+        # 公式不含当前生命时每回合数值固定，只算一次
+        self.amount = None if "hp" in names else self._evaluate(stats["hp"])
+
+    def _evaluate(self, hp: np.ndarray) -> np.ndarray:
+        arguments = self.arguments
+        amount = np.asarray(self.formula(*arguments[:-3], hp, *arguments[-3:]))
+        if amount.dtype.kind not in "iu":
+            raise ValueError("状态效果每回合的数值必须是整数")
+        return amount
+
+    def tick(self, hp: np.ndarray, max_hp: np.ndarray, mask: np.ndarray) -> None:
+        """对mask内且剩余回合>0的战斗结算一次（原地修改hp和剩余回合）"""
+        ticking = mask & (self.remaining > 0)
+        amount = self.amount if self.amount is not None else self._evaluate(hp)
+        if self.heal:
+            np.copyto(hp, np.minimum(max_hp, hp + amount), where=ticking)
+        else:
+            hp -= np.where(ticking, amount, 0)
+            np.maximum(hp, 0, out=hp)
+        self.remaining -= ticking
+
+
+def _resolution_key(column: StatusColumn) -> Tuple[int, str]:
+    probe = column.effect_class()
+    return probe.get_priority().value, probe.name
+
+
+def _status_lanes(batch: BattleBatch, p_hp: np.ndarray, e_hp: np.ndarray) -> List[_StatusLane]:
+    """按结算顺序排列的状态列：先玩家后敌人，同一方内与 StatusManager 的结算顺序一致"""
+    stats = {
+        "player": {"hp": p_hp, "max_hp": batch.player_max_hp,
+                   "attack": batch.player_attack, "defense": batch.player_defense},
+        "enemy": {"hp": e_hp, "max_hp": batch.enemy_max_hp,
+                  "attack": batch.enemy_attack, "defense": batch.enemy_defense},
+    }
+    columns = [column for column in batch.status_columns() if column.remaining.any()]
+    columns.sort(key=_resolution_key, reverse=True)
+    columns.sort(key=lambda column: column.side != "player")
+    return [_StatusLane(column, stats[column.side]) for column in columns]
+
+
+def simulate_batch(batch: BattleBatch, turn_limit: int = BattleConfig.turn_limit) -> BatchOutcome:
+    """同时推进一批战斗直到全部结束"""
+    p_hp = batch.player_hp.astype(np.int64, copy=True)
+    e_hp = batch.enemy_hp.astype(np.int64, copy=True)
+
+    player_damage = np.maximum(1, batch.player_attack - batch.enemy_defense)
+    enemy_damage = np.maximum(1, batch.enemy_attack - batch.player_defense)
+    # 防御时伤害为 int(damage * 0.5)，伤害非负时等价于整除2
+    enemy_damage = np.where(batch.player_defends, enemy_damage // 2, enemy_damage)
+    player_attacks = ~batch.player_defends
+    # 每种状态效果一列，回合结束时整列一次结算
+    lanes = _status_lanes(batch, p_hp, e_hp)
+
+    n = len(batch)
+    result = np.full(n, ONGOING, dtype=np.int8)
+    turns = np.zeros(n, dtype=np.int64)
+    done = (p_hp <= 0) | (e_hp <= 0) | (turn_limit <= 0)
+
+    turn = 0
+    while turn < turn_limit and not done.all():
+        turn += 1
+        active = ~done
+
+        # 玩家行动
+        e_hp -= np.where(active & player_attacks, player_damage, 0)
+        np.maximum(e_hp, 0, out=e_hp)
+
+        # 敌人行动与回合结束结算：战斗已结束或已到回合上限时跳过
+        if turn < turn_limit:
+            rest_of_turn = active & (p_hp > 0) & (e_hp > 0)
+            p_hp -= np.where(rest_of_turn, enemy_damage, 0)
+            np.maximum(p_hp, 0, out=p_hp)
+
+            for lane in lanes:
+                if lane.player_side:
+                    lane.tick(p_hp, batch.player_max_hp, rest_of_turn)
+                else:
+                    lane.tick(e_hp, batch.enemy_max_hp, rest_of_turn)
+
+        finished = active & ((p_hp <= 0) | (e_hp <= 0) | (turn >= turn_limit))
+        turns[finished] = turn
+        done |= finished
+
+    result[p_hp <= 0] = DEFEAT
+    result[(p_hp > 0) & (e_hp <= 0)] = VICTORY
+    result[(p_hp > 0) & (e_hp > 0)] = DRAW
+    return BatchOutcome(result=result, turns=turns, player_hp=p_hp, enemy_hp=e_hp)
+
+
+def _make_combatant(name: str, stats: Dict[str, int]):
+    """按属性创建一个没有技能和装备的对象引擎角色"""
+    from characters.base_character import BaseCharacter
+
+    character = BaseCharacter(name)
+    character.base_hp = stats["max_hp"]
+    character.base_attack = stats["attack"]
+    character.base_defense = stats["defense"]
+    character.recalc_stats()
+    character.hp = stats.get("hp", character.max_hp)
+    return character
+
+
+def cross_check(batch: BattleBatch, turn_limit: int = BattleConfig.turn_limit,
+                sample: Optional[Sequence[int]] = None) -> List[Tuple[int, str]]:
+    """用对象引擎逐场重跑（或只重跑sample中的场次），返回不一致的 (场次, 说明) 列表"""
+    from .battle_engine import BattleEngine
+    from .headless import attack_policy, null_output
+
+    def defend_policy(context) -> int:
+        return 2
+
+    outcome = simulate_batch(batch, turn_limit)
+    columns = batch.status_columns()
+    mismatches = []
+    indices = range(len(batch)) if sample is None else sample
+    for i in indices:
+        player = _make_combatant("玩家", {
+            "hp": int(batch.player_hp[i]), "max_hp": int(batch.player_max_hp[i]),
+            "attack": int(batch.player_attack[i]), "defense": int(batch.player_defense[i])})
+        enemy = _make_combatant("敌人", {
+            "hp": int(batch.enemy_hp[i]), "max_hp": int(batch.enemy_max_hp[i]),
+            "attack": int(batch.enemy_attack[i]), "defense": int(batch.enemy_defense[i])})
+        policy = defend_policy if batch.player_defends[i] else attack_policy
+        config = BattleConfig(allow_flee=False, show_detailed_log=False, turn_limit=turn_limit)
+        engine = BattleEngine(player, enemy, config, player_policy=policy, output=null_output)
+        # 按列的顺序施加（burn 在 poison 前：中毒已存在时无法再施加灼烧）
+        for column in columns:
+            if column.remaining[i] > 0:
+                effect = column.effect_class(duration=int(column.remaining[i]),
+                                             **{name: values[i].item() for name, values in column.params.items()})
+                effect.stacks = int(column.stacks[i])
+                (player if column.side == "player" else enemy).add_status_effect(effect)
+        result, summary = engine.run_headless()
+
+        expected = (RESULT_NAMES[int(outcome.result[i])], int(outcome.turns[i]),
+                    int(outcome.player_hp[i]), int(outcome.enemy_hp[i]))
+        actual = (result.value, summary["turns"], player.hp, enemy.hp)
+        if expected != actual:
+            mismatches.append((i, f"向量内核 {expected} != 对象引擎 {actual}"))
+    return mismatches
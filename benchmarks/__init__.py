@@ -0,0 +1,17 @@
+"""
+性能基准测试
+覆盖战斗热路径与存档系统，结果以JSON输出，并可与基线结果对比以发现性能回退
+
+运行方式：python -m benchmarks --output results.json [--baseline baseline.json]
+"""
+
+from .core import Benchmark, BenchmarkResult, register, registered, run_benchmarks, compare_results
+
+__all__ = [
+    'Benchmark',
+    'BenchmarkResult',
+    'register',
+    'registered',
+    'run_benchmarks',
+    'compare_results'
+]
@@ -0,0 +1,58 @@
+"""命令行入口：python -m benchmarks [--filter 模式] [--output 文件] [--baseline 文件]"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.core import compare_results, run_benchmarks
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="战斗热路径与存档系统性能基准")
+    parser.add_argument("--filter", default="*", help="用例名称通配符，如 'status.*'")
+    parser.add_argument("--rounds", type=int, default=5, help="每个用例的计时轮数")
+    parser.add_argument("--output", help="把结果写入JSON文件")
+    parser.add_argument("--baseline", help="与基线JSON文件比较")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="慢于基线超过该比例视为性能回退（默认0.2即20%%）")
+    args = parser.parse_args(argv)
+
+    def progress(result):
+        if result.error:
+            print(f"{result.name:<36} 失败: {result.error}")
+        else:
+            print(f"{result.name:<36} {result.median_us:12.2f} us/次  (最小 {result.min_us:.2f}, x{result.number})")
+
+    results = run_benchmarks(args.filter, args.rounds, progress)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    rows = compare_results(results, baseline, args.threshold)
+    print("\n与基线比较:")
+    for row in rows:
+        if row["current_us"] is None:
+            state = "失败" if row["status"] == "error" else "缺失"
+            print(f"❌ {row['name']:<36} {row['baseline_us']:12.2f} -> {state}")
+            continue
+        marker = {"regression": "❌", "improvement": "✅"}.get(row["status"], "  ")
+        print(f"{marker} {row['name']:<36} {row['baseline_us']:12.2f} -> {row['current_us']:12.2f} us  x{row['ratio']:.2f}")
+    # 基线中能运行的用例失败或消失同样视为回退
+    regressions = [row for row in rows if row["status"] in ("regression", "error", "missing")]
+    if regressions:
+        print(f"\n发现 {len(regressions)} 个性能回退")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""战斗热路径用例：完整回合、属性重算、状态结算、装备特效、敌人创建"""
+
+from output_sink import NULL_SINK
+from .core import Benchmark, register
+
+# 状态数量基准使用的效果类型（彼此不互斥）
+_STATUS_TYPES = ("PoisonEffect", "HealOverTimeEffect", "AttackBuffEffect",
+                 "DefenseBuffEffect", "SpeedDebuffEffect", "DodgeBuffEffect")
+# 没有每回合行为的被动效果
+_PASSIVE_TYPES = ("AttackBuffEffect", "DefenseBuffEffect", "SpeedDebuffEffect", "DodgeBuffEffect")
+
+
+def _player(level: int = 5, equipment=()):
+    from battle_system.simulation import PlayerBuild
+    return PlayerBuild("MAGE", level, tuple(equipment)).build(NULL_SINK)
+
+
+def _setup_turn():
+    from battle_system import BattleConfig, BattleEngine, skill_first_policy
+    from battle_system.simulation import EnemySpec
+
+    player = _player(5)
+    player.base_hp = player.max_hp = player.hp = 10 ** 6
+    enemy = EnemySpec("boss", 1).build()
+    enemy.base_hp = enemy.max_hp = enemy.hp = 10 ** 6
+    config = BattleConfig(allow_flee=False, show_detailed_log=False, seed=0)
+    engine = BattleEngine(player, enemy, config, player_policy=skill_first_policy, output=NULL_SINK)
+    # 先推进几个回合，让技能冷却和状态效果进入常态
+    for _ in range(3):
+        engine.context.next_turn()
+        engine._process_turn()
+    return engine, engine.context.snapshot()
+
+
+def _battle_turn(state):
+    engine, snapshot = state
+    engine.context.restore(snapshot)
+    engine.context.next_turn()
+    engine._process_turn()
+
+
+def _snapshot_restore(state):
+    engine, snapshot = state
+    engine.context.restore(snapshot)
+
+
+def _buffed_character(count: int, types=_STATUS_TYPES):
+    import status_effects
+    from characters.base_character import BaseCharacter
+
+    character = BaseCharacter("基准角色")
+    character.base_hp = character.max_hp = character.hp = 10 ** 9
+    for i in range(count):
+        # 为每个效果生成独立的子类，使同名效果不会被合并为一层
+        base = getattr(status_effects, types[i % len(types)])
+        effect_type = type(f"{base.__name__}Bench{i}", (base,), {})
+        result = character.status_manager.add_status(effect_type(duration=10 ** 9))
+        if not result["success"]:
+            raise RuntimeError(result["message"])
+    return character
+
+
+def _setup_status(count: int):
+    return lambda: _buffed_character(count).status_manager
+
+
+def _setup_on_hit():
+    from characters.base_character import BaseCharacter
+
+    player = _player(10, ("ArchmageStaff",))
+    target = BaseCharacter("木桩")
+    target.base_hp = target.max_hp = target.hp = 10 ** 9
+    return player, target
+
+
+def _on_hit(state):
+    player, target = state
+    player.trigger_on_hit(target)
+
+
+def _enemy_factory(name: str):
+    def create(_):
+        from enemy.lothir import get_creature_by_name
+        get_creature_by_name(name)
+    return create
+
+
+register(Benchmark("battle.turn", _battle_turn, _setup_turn,
+                   description="恢复快照后推进一个完整回合（玩家技能优先，对阵1层Boss）"))
+register(Benchmark("battle.snapshot_restore", _snapshot_restore, _setup_turn,
+                   description="BattleContext.restore 单独耗时，用于从 battle.turn 中扣除"))
+register(Benchmark("character.recalc_stats", lambda player: player.recalc_stats(), _player,
+                   description="5级法师重算属性"))
+register(Benchmark("character.recalc_stats[20]", lambda character: character.recalc_stats(),
+                   lambda: _buffed_character(20), description="带20个状态效果的角色重算属性"))
+for _count in (0, 5, 20):
+    register(Benchmark(f"status.update_all[{_count}]", lambda manager: manager.update_all(),
+                       _setup_status(_count), description=f"{_count}个状态效果的每回合结算"))
+register(Benchmark("status.update_all[被动100]", lambda manager: manager.update_all(),
+                   lambda: _buffed_character(100, _PASSIVE_TYPES).status_manager,
+                   description="100个被动增益（无每回合行为）的每回合结算"))
+register(Benchmark("equipment.trigger_on_hit", _on_hit, _setup_on_hit,
+                   description="大法师之杖三个命中特效"))
+
+
+def _register_enemies():
+    from enemy.lothir import ALL_LOTHIR_CREATURES
+    for name in ALL_LOTHIR_CREATURES:
+        register(Benchmark(f"enemy.create[{name}]", _enemy_factory(name),
+                           description=f"创建 {name}"))
+
+
+_register_enemies()
@@ -0,0 +1,165 @@
+"""基准测试框架 - 注册、计时、JSON结果与基线对比"""
+
+import fnmatch
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+# 每轮计时的最短时长（秒），不足时自动增加每轮的执行次数
+MIN_ROUND_TIME = 0.05
+
+
+@dataclass
+class Benchmark:
+    """一个基准测试用例
+
+    setup() 在计时之外执行一次，返回值作为参数传给每次被计时的 func()。
+    teardown(state) 在全部计时结束后调用，用于清理临时文件等。
+    """
+    name: str
+    func: Callable[[Any], Any]
+    setup: Callable[[], Any] = lambda: None
+    teardown: Optional[Callable[[Any], None]] = None
+    description: str = ""
+
+
+@dataclass
+class BenchmarkResult:
+    """单个用例的结果，时间单位为微秒/次"""
+    name: str
+    median_us: float = 0.0
+    min_us: float = 0.0
+    mean_us: float = 0.0
+    rounds: int = 0
+    number: int = 0
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+_REGISTRY: List[Benchmark] = []
+
+
+def register(benchmark: Benchmark) -> Benchmark:
+    """注册用例（按注册顺序运行）"""
+    _REGISTRY.append(benchmark)
+    return benchmark
+
+
+def registered() -> List[Benchmark]:
+    """所有已注册的用例"""
+    # 导入用例模块以完成注册
+    from . import combat, saves  # noqa: F401
+    return list(_REGISTRY)
+
+
+def _calibrate(func: Callable[[Any], Any], state: Any) -> int:
+    """找到使单轮耗时不少于 MIN_ROUND_TIME 的执行次数"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func(state)
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_ROUND_TIME or number >= 1 << 20:
+            return number
+        number *= 10 if elapsed < MIN_ROUND_TIME / 10 else 2
+
+
+def run_benchmark(benchmark: Benchmark, rounds: int = 5) -> BenchmarkResult:
+    """运行单个用例"""
+    result = BenchmarkResult(benchmark.name)
+    state = None
+    try:
+        state = benchmark.setup()
+        func = benchmark.func
+        number = _calibrate(func, state)
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for _ in range(number):
+                func(state)
+            timings.append((time.perf_counter() - start) / number * 1e6)
+        result.median_us = statistics.median(timings)
+        result.min_us = min(timings)
+        result.mean_us = statistics.fmean(timings)
+        result.rounds = rounds
+        result.number = number
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    finally:
+        if benchmark.teardown is not None and state is not None:
+            benchmark.teardown(state)
+    return result
+
+
+def run_benchmarks(pattern: str = "*", rounds: int = 5,
+                   progress: Optional[Callable[[BenchmarkResult], None]] = None) -> Dict[str, Any]:
+    """运行名称匹配 pattern（通配符）的所有用例，返回可直接写入JSON的结果"""
+    results = {}
+    for benchmark in registered():
+        if not fnmatch.fnmatch(benchmark.name, pattern):
+            continue
+        result = run_benchmark(benchmark, rounds)
+        results[benchmark.name] = result.to_dict()
+        if progress is not None:
+            progress(result)
+    return {
+        "meta": {
+            "timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "rounds": rounds,
+            "filter": pattern,
+        },
+        "results": results,
+    }
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any],
+                    threshold: float = 0.2) -> List[Dict[str, Any]]:
+    """按中位数比较两次结果
+
+    Returns:
+        基线中成功运行的每个用例一项：name、baseline_us、current_us、ratio（当前/基线）、
+        status（"regression" 慢于基线超过threshold，"improvement" 快于基线超过threshold，
+        "error" 本次运行失败，"missing" 本次运行匹配的用例中没有它，否则 "ok"）；
+        "error" / "missing" 的 current_us 和 ratio 为None
+    """
+    pattern = current.get("meta", {}).get("filter", "*")
+    rows = []
+    for name, base in baseline["results"].items():
+        if base.get("error") or not base["median_us"]:
+            continue
+        cur = current["results"].get(name)
+        if cur is None or cur.get("error"):
+            if cur is None and not fnmatch.fnmatch(name, pattern):
+                continue
+            rows.append({
+                "name": name,
+                "baseline_us": base["median_us"],
+                "current_us": None,
+                "ratio": None,
+                "status": "missing" if cur is None else "error",
+            })
+            continue
+        ratio = cur["median_us"] / base["median_us"]
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 / (1 + threshold):
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append({
+            "name": name,
+            "baseline_us": base["median_us"],
+            "current_us": cur["median_us"],
+            "ratio": ratio,
+            "status": status,
+        })
+    return rows
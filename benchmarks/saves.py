@@ -0,0 +1,56 @@
+"""存档系统用例：在含1000个存档的临时目录中保存、加载与列出角色"""
+
+import contextlib
+import itertools
+import os
+import shutil
+import tempfile
+
+from output_sink import NULL_SINK
+from .core import Benchmark, register
+
+SAVE_COUNT = 1000
+
+
+def _setup_saves():
+    from save_system import SaveSystem
+    from battle_system.simulation import PlayerBuild
+
+    directory = tempfile.mkdtemp(prefix="dnd_bench_saves_")
+    save_system = SaveSystem.__new__(SaveSystem)
+    save_system.SAVE_DIR = directory
+    player = PlayerBuild("MAGE", 5).build(NULL_SINK)
+    for i in range(SAVE_COUNT):
+        player.name = f"存档{i:04d}"
+        save_system.save_character(player)
+    names = itertools.cycle([f"存档{i:04d}" for i in range(SAVE_COUNT)])
+    return save_system, player, names, directory
+
+
+def _teardown_saves(state):
+    shutil.rmtree(state[3], ignore_errors=True)
+
+
+def _save(state):
+    save_system, player, names, _ = state
+    player.name = next(names)
+    save_system.save_character(player)
+
+
+def _load(state):
+    save_system, _, names, _ = state
+    # 加载时创建的角色会输出装备信息，这里丢弃
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        save_system.load_character(next(names))
+
+
+def _list(state):
+    state[0].list_saved_characters()
+
+
+register(Benchmark("save.save", _save, _setup_saves, _teardown_saves,
+                   description=f"在{SAVE_COUNT}个存档中覆盖保存一个角色"))
+register(Benchmark("save.load", _load, _setup_saves, _teardown_saves,
+                   description=f"在{SAVE_COUNT}个存档中加载一个角色"))
+register(Benchmark("save.list", _list, _setup_saves, _teardown_saves,
+                   description=f"列出{SAVE_COUNT}个存档"))
@@ -1,12 +1,14 @@
 """角色基类 - 使用新的状态效果系统"""
 
+import random
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from enum import Enum
-from typing import Dict, List, Optional, Any
+from typing import Any, Callable, Dict, List, Optional
 
 from .equipments.base_equipments import Armor, DamageEffect, DamageType, EquipSlot, Equipment, PercentModifier, Stat, Weapon
 from status_effects import StatusManager
+from output_sink import OutputSink, as_sink
 from .skills.base_skill import Skill, SkillType
 
 
@@ -98,7 +100,7 @@ class Inventory:
 class BaseCharacter(ABC):
     """角色基类"""
     
-    def __init__(self, name: str, level: int = 1):
+    def __init__(self, name: str, level: int = 1, output: Optional[OutputSink] = None):
         # 基本信息
         self.name = name
         self.level = level
@@ -120,6 +122,8 @@ class BaseCharacter(ABC):
         self.max_mp = self.base_mp
         self.mp = self.max_mp
         self.spell_power = self.base_spell_power
+        # 速度，决定多人战斗中的行动频率（100为每轮行动一次）
+        self.speed = 100
         
         # 系统组件
         self.inventory = Inventory()
@@ -128,6 +132,11 @@ class BaseCharacter(ABC):
             slot: None for slot in [EquipSlot.UPPER, EquipSlot.LOWER, EquipSlot.ACCESSORY]
         }
         self.skills: List[Skill] = []
+        # 可用技能缓存，仅在法力值、等级、技能列表或冷却变化时重新筛选
+        # _skills_version 在本角色的技能冷却变化时加一（一个技能实例只属于一个角色）
+        self._skills_version = 0
+        self._usable_skills_key: Optional[tuple] = None
+        self._usable_skills: tuple = ()
         
         # 状态管理器 - 管理所有状态效果
         self.status_manager = StatusManager(self)
@@ -136,15 +145,51 @@ class BaseCharacter(ABC):
         self.can_act = True
         self.can_cast = True
         
+        # 随机数来源，战斗中由BattleContext绑定为本场战斗的随机数流
+        self.rng = random
+        
+        # 文本输出接口，战斗中由BattleContext绑定为本场战斗的输出
+        self.output = as_sink(output)
+        
+        # 所在战斗的上下文，战斗中由BattleContext设置（供AI前瞻搜索使用）
+        self.battle_context = None
+        
         # 装备系统
         self.equipment: Dict[EquipSlot, Optional[Equipment]] = {
             slot: None for slot in EquipSlot
         }
         self._percent_pool: Dict[Stat, float] = {s: 0.0 for s in Stat}
+        # 所有装备效果的命中回调，穿脱装备时重建，战斗中按顺序直接调用
+        self.on_hit_handlers: List[Callable[["BaseCharacter", "BaseCharacter"], Any]] = []
         
         # 初始化属性
         self.recalc_stats()
 
+    def snapshot_state(self) -> tuple:
+        """记录战斗中会变化的状态：生命、法力、当前属性、行动标志、状态效果与技能冷却"""
+        return (self.hp, self.mp, self.max_hp, self.max_mp, self.attack, self.defense,
+                self.spell_power, self.can_act, self.can_cast,
+                self.status_manager.snapshot(),
+                tuple(skill.current_cooldown for skill in self.skills),
+                self._get_extra_state())
+
+    def restore_state(self, state: tuple):
+        """恢复 snapshot_state() 记录的状态"""
+        (self.hp, self.mp, self.max_hp, self.max_mp, self.attack, self.defense,
+         self.spell_power, self.can_act, self.can_cast,
+         status_snapshot, cooldowns, extra) = state
+        self.status_manager.restore(status_snapshot)
+        for skill, cooldown in zip(self.skills, cooldowns):
+            skill.current_cooldown = cooldown
+        self._set_extra_state(extra)
+
+    def _get_extra_state(self) -> Any:
+        """子类额外的战斗状态（如Boss的攻击模式），默认无"""
+        return None
+
+    def _set_extra_state(self, extra: Any):
+        pass
+
     def recalc_stats(self):
         """重新计算属性（包括装备和状态效果）"""
         # 基础属性计算（装备加成）
@@ -176,8 +221,9 @@ class BaseCharacter(ABC):
         self._apply_modifiers_from_equipment(eq, remove=False)
         
         self.equipment[eq.slot] = eq
+        self._rebuild_on_hit_handlers()
         self.recalc_stats()
-        print(f"{self.name} 装备了 {eq.name}")
+        self.output(f"{self.name} 装备了 {eq.name}")
 
     def unequip(self, slot: EquipSlot) -> None:
         """卸下装备"""
@@ -186,8 +232,9 @@ class BaseCharacter(ABC):
             return
         self._apply_modifiers_from_equipment(eq, remove=True)
         self.equipment[slot] = None
+        self._rebuild_on_hit_handlers()
         self.recalc_stats()
-        print(f"{self.name} 卸下了 {eq.name}")
+        self.output(f"{self.name} 卸下了 {eq.name}")
 
     def _apply_modifiers_from_equipment(self, eq: Equipment, remove: bool = False):
         """应用装备修饰符"""
@@ -195,21 +242,31 @@ class BaseCharacter(ABC):
         for mod in eq.percent_mods:
             self._percent_pool[mod.stat] += sign * mod.percent
 
+    def _rebuild_on_hit_handlers(self):
+        """按槽位顺序收集所有装备效果的on_hit"""
+        self.on_hit_handlers = [effect.on_hit
+                                for eq in self.equipment.values() if eq
+                                for effect in eq.effects]
+
+    def trigger_on_hit(self, target: "BaseCharacter"):
+        """触发装备的命中效果"""
+        for handler in self.on_hit_handlers:
+            handler(self, target)
+
     def attack_target(self, target: "BaseCharacter"):
         """攻击目标"""
         if not self.can_act:
-            print(f"{self.name} 无法行动！")
+            self.output(f"{self.name} 无法行动！")
             return
             
         damage = max(1, self.attack - target.defense)
         target.take_damage(damage, DamageType.PHYSICAL)
-        print(f"{self.name} 普攻造成 {damage} 点伤害")
+        if self.output.enabled:
+            self.output.write(f"{self.name} 普攻造成 {damage} 点伤害",
+                              kind="attack", actor=self.name, target=target.name, amount=damage)
         
         # 触发装备效果
-        for eq in self.equipment.values():
-            if eq:
-                for eff in eq.effects:
-                    eff.on_hit(self, target)
+        self.trigger_on_hit(target)
 
     def take_damage(self, dmg: int, dmg_type: DamageType):
         """受到伤害"""
@@ -310,6 +367,18 @@ class BaseCharacter(ABC):
             return True
         return False
 
+    def get_usable_skills(self) -> tuple:
+        """当前可用的技能（按技能列表顺序，结果只读）"""
+        skills = self.skills
+        key = (self.mp, self.level, self._skills_version, id(skills), len(skills))
+        if key != self._usable_skills_key:
+            for skill in skills:
+                if skill._cooldown_owner is not self:
+                    skill._cooldown_owner = self
+            self._usable_skills = tuple(s for s in skills if s.can_use(self))
+            self._usable_skills_key = key
+        return self._usable_skills
+
     def use_skill(self, skill_name: str, target=None) -> Dict[str, Any]:
         """使用技能"""
         if not self.can_act:
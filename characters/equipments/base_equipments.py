@@ -39,8 +39,12 @@ class PercentModifier:
 # 3. 装备效果系统
 # ----------------------------------------
 class EquipmentEffect(ABC):
-    """所有可触发的装备效果基类"""
-    def on_hit(self) -> None: ...
+    """所有可触发的装备效果基类
+
+    on_hit 在装备者命中目标后调用；角色在穿脱装备时把所有效果的 on_hit
+    预先收集到 on_hit_handlers 中，战斗中直接依次调用。
+    """
+    def on_hit(self, attacker, target) -> None: ...
 
 @dataclass
 class DamageEffect(EquipmentEffect):
@@ -49,10 +53,15 @@ class DamageEffect(EquipmentEffect):
     dmg_type: DamageType
 
     def on_hit(self, attacker, target):
-        raw = getattr(attacker, self.scale_stat.name.lower())
+        raw = getattr(attacker, self.scale_stat.name.lower(), 0)
         damage = int(raw * self.coefficient)
+        if damage <= 0:
+            return
         target.take_damage(damage, self.dmg_type)
-        print(f"[效果] {attacker.name} 的装备追加 {damage} {self.dmg_type.name} 伤害!")
+        if attacker.output.enabled:
+            attacker.output.write(f"[效果] {attacker.name} 的装备追加 {damage} {self.dmg_type.name} 伤害!",
+                                  kind="equipment_damage", actor=attacker.name, target=target.name,
+                                  amount=damage)
 
 
 
@@ -15,10 +15,11 @@ class ManaSurgeEffect(EquipmentEffect):
         self.mana_restore = mana_restore
     
     def on_hit(self, attacker, target):
-        import random
-        if random.random() < self.chance:
+        if attacker.rng.random() < self.chance:
             attacker.mp = min(attacker.mp + self.mana_restore, attacker.max_mp)
-            print(f"[法力涌动] {attacker.name} 恢复了 {self.mana_restore} 点法力值!")
+            if attacker.output.enabled:
+                attacker.output.write(f"[法力涌动] {attacker.name} 恢复了 {self.mana_restore} 点法力值!",
+                                      kind="mana_surge", actor=attacker.name, amount=self.mana_restore)
 
 
 class SpellVampEffect(EquipmentEffect):
@@ -40,10 +41,13 @@ class ArcaneExplosionEffect(EquipmentEffect):
         self.damage_scale = damage_scale
     
     def on_hit(self, attacker, target):
-        import random
-        if random.random() < self.chance:
+        if attacker.rng.random() < self.chance:
             damage = int(attacker.spell_power * self.damage_scale)
-            print(f"[奥术爆炸] {attacker.name} 引发了奥术爆炸，造成 {damage} 点额外魔法伤害!")
+            target.take_damage(damage, DamageType.MAGICAL)
+            if attacker.output.enabled:
+                attacker.output.write(f"[奥术爆炸] {attacker.name} 引发了奥术爆炸，造成 {damage} 点额外魔法伤害!",
+                                      kind="arcane_explosion", actor=attacker.name, target=target.name,
+                                      amount=damage)
 
 
 # ----------------------------------------
@@ -10,8 +10,8 @@ from characters.equipments.mage.mage_armors import ArcaneRobes
 class PlayerCharacter(BaseCharacter):
     """玩家角色类"""
     
-    def __init__(self, name: str, character_class: CharacterClass):
-        super().__init__(name, level=1)
+    def __init__(self, name: str, character_class: CharacterClass, output=None):
+        super().__init__(name, level=1, output=output)
         self.character_class = character_class
         self.current_floor = 1
         self.defeated_bosses = set()  # 已击败的层主
@@ -15,16 +15,31 @@ class SkillType(Enum):
 class Skill(ABC):
     """技能基类"""
     
+    # 持有该技能的角色，由角色筛选可用技能时绑定；冷却值变化时只让该角色的可用技能缓存失效
+    _cooldown_owner = None
+    
     def __init__(self, name: str, skill_type: SkillType, mp_cost: int = 0, 
                  cooldown: int = 0, description: str = "", level_requirement: int = 1):
         self.name = name
         self.skill_type = skill_type
         self.mp_cost = mp_cost
         self.cooldown = cooldown
-        self.current_cooldown = 0
+        self._current_cooldown = 0
         self.description = description
         self.level_requirement = level_requirement
     
+    @property
+    def current_cooldown(self) -> int:
+        return self._current_cooldown
+    
+    @current_cooldown.setter
+    def current_cooldown(self, value: int):
+        if value != self._current_cooldown:
+            self._current_cooldown = value
+            owner = self._cooldown_owner
+            if owner is not None:
+                owner._skills_version += 1
+    
     def can_use(self, character) -> bool:
         """检查是否可以使用技能"""
         return (character.mp >= self.mp_cost and 
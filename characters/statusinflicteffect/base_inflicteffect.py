@@ -1,8 +1,7 @@
 """状态施加效果 - 更新为使用新的状态效果系统"""
 
-import random
 from typing import Callable
-from ..status_effects import PoisonEffect, BurnEffect, StunEffect
+from status_effects import PoisonEffect, BurnEffect, StunEffect
 
 
 class StatusInflictEffect:
@@ -20,11 +19,13 @@ class StatusInflictEffect:
     
     def on_hit(self, attacker, target):
         """攻击命中时触发"""
-        if random.random() < self.chance:
+        if attacker.rng.random() < self.chance:
             status_effect = self.status_factory(**self.kwargs)
             result = target.add_status_effect(status_effect)
-            if result["success"]:
-                print(f"[效果] {attacker.name} 使 {target.name} 附加 {status_effect.name}")
+            if result["success"] and attacker.output.enabled:
+                attacker.output.write(f"[效果] {attacker.name} 使 {target.name} 附加 {status_effect.name}",
+                                      kind="status_inflict", actor=attacker.name, target=target.name,
+                                      status=status_effect.name)
             return result
         return {"success": False, "message": "未触发状态效果"}
 
@@ -85,11 +85,10 @@ class BaseEnemy(BaseCharacter):
             }
         
         # 简单AI：如果有可用技能，50%概率使用技能
-        usable_skills = [s for s in self.skills if s.can_use(self)]
-        if usable_skills and len(usable_skills) > 0:
-            import random
-            if random.random() < 0.5:
-                skill = random.choice(usable_skills)
+        usable_skills = self.get_usable_skills()
+        if usable_skills:
+            if self.rng.random() < 0.5:
+                skill = self.rng.choice(usable_skills)
                 return {
                     'type': 'skill',
                     'skill': skill,
@@ -1,8 +1,10 @@
 """攻击模式系统 - 为敌人设计不同的攻击策略"""
 
-from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+import math
 import random
+import time
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Optional, Sequence
 from characters.skills.base_skill import Skill
 from characters.base_character import BaseCharacter
 
@@ -20,9 +22,22 @@ class AttackPattern(ABC):
         """选择要执行的动作（技能或普通攻击）"""
         pass
     
+    def get_state(self) -> Any:
+        """攻击模式的内部状态（用于战斗快照），无状态的模式返回None"""
+        return None
+    
+    def set_state(self, state: Any):
+        pass
+    
     def can_use_skill(self, skill: Skill, attacker: BaseCharacter) -> bool:
         """检查是否可以使用技能"""
         return skill.can_use(attacker)
+    
+    def get_usable_skills(self, attacker: BaseCharacter, available_skills: List[Skill]) -> Sequence[Skill]:
+        """可用技能列表；传入的是攻击者自身技能列表时直接使用其缓存快照"""
+        if available_skills is attacker.skills:
+            return attacker.get_usable_skills()
+        return [skill for skill in available_skills if self.can_use_skill(skill, attacker)]
 
 
 class RandomSkillPattern(AttackPattern):
@@ -34,10 +49,10 @@ class RandomSkillPattern(AttackPattern):
     def select_action(self, attacker: BaseCharacter, target: BaseCharacter, 
                      available_skills: List[Skill]) -> Dict[str, Any]:
         """随机选择技能或普通攻击"""
-        usable_skills = [skill for skill in available_skills if self.can_use_skill(skill, attacker)]
+        usable_skills = self.get_usable_skills(attacker, available_skills)
         
-        if usable_skills and random.random() < 0.7:  # 70%概率使用技能
-            selected_skill = random.choice(usable_skills)
+        if usable_skills and attacker.rng.random() < 0.7:  # 70%概率使用技能
+            selected_skill = attacker.rng.choice(usable_skills)
             return {
                 'type': 'skill',
                 'skill': selected_skill,
@@ -57,10 +72,16 @@ class SequentialSkillPattern(AttackPattern):
         super().__init__("顺序技能", "按固定顺序循环使用技能")
         self.current_index = 0
     
+    def get_state(self) -> Any:
+        return self.current_index
+    
+    def set_state(self, state: Any):
+        self.current_index = state
+    
     def select_action(self, attacker: BaseCharacter, target: BaseCharacter, 
                      available_skills: List[Skill]) -> Dict[str, Any]:
         """按顺序选择技能"""
-        usable_skills = [skill for skill in available_skills if self.can_use_skill(skill, attacker)]
+        usable_skills = self.get_usable_skills(attacker, available_skills)
         
         if usable_skills:
             selected_skill = usable_skills[self.current_index % len(usable_skills)]
@@ -87,7 +108,7 @@ class PrioritySkillPattern(AttackPattern):
     def select_action(self, attacker: BaseCharacter, target: BaseCharacter, 
                      available_skills: List[Skill]) -> Dict[str, Any]:
         """根据优先级选择技能"""
-        usable_skills = [skill for skill in available_skills if self.can_use_skill(skill, attacker)]
+        usable_skills = self.get_usable_skills(attacker, available_skills)
         
         if not usable_skills:
             return {
@@ -118,9 +139,9 @@ class PrioritySkillPattern(AttackPattern):
             # 随机选择攻击技能
             attack_skills = [skill for skill in usable_skills if "攻击" in skill.name or "伤害" in skill.name]
             if attack_skills:
-                selected_skill = random.choice(attack_skills)
+                selected_skill = attacker.rng.choice(attack_skills)
             else:
-                selected_skill = random.choice(usable_skills)
+                selected_skill = attacker.rng.choice(usable_skills)
             
             return {
                 'type': 'skill',
@@ -137,6 +158,12 @@ class EnragedPattern(AttackPattern):
         self.enrage_threshold = enrage_threshold
         self.is_enraged = False
     
+    def get_state(self) -> Any:
+        return self.is_enraged
+    
+    def set_state(self, state: Any):
+        self.is_enraged = state
+    
     def select_action(self, attacker: BaseCharacter, target: BaseCharacter, 
                      available_skills: List[Skill]) -> Dict[str, Any]:
         """狂暴状态下的攻击选择"""
@@ -145,7 +172,7 @@ class EnragedPattern(AttackPattern):
         if hp_ratio <= self.enrage_threshold:
             self.is_enraged = True
         
-        usable_skills = [skill for skill in available_skills if self.can_use_skill(skill, attacker)]
+        usable_skills = self.get_usable_skills(attacker, available_skills)
         
         if self.is_enraged and usable_skills:
             # 狂暴状态下优先使用最强技能
@@ -156,8 +183,8 @@ class EnragedPattern(AttackPattern):
                 'target': target,
                 'enraged': True
             }
-        elif usable_skills and random.random() < 0.5:
-            selected_skill = random.choice(usable_skills)
+        elif usable_skills and attacker.rng.random() < 0.5:
+            selected_skill = attacker.rng.choice(usable_skills)
             return {
                 'type': 'skill',
                 'skill': selected_skill,
@@ -169,3 +196,149 @@ class EnragedPattern(AttackPattern):
                 'target': target,
                 'enraged': self.is_enraged
             }
+
+
+class SearchPattern(AttackPattern):
+    """搜索模式 - 按战斗引擎的回合规则推演每个候选行动，选择期望结果最好的行动
+    
+    推演从当前战斗状态的快照开始，每次推演结束后恢复快照，不重建角色。
+    每个候选行动先推演一次，之后按UCB1分配剩余次数（单层蒙特卡洛树搜索）。
+    time_budget（秒）和 max_rollouts 共同限制每次决策的开销；
+    time_budget 为None时只受推演次数限制，结果完全可复现。
+    """
+    
+    # 推演随机数流在战斗随机数派生路径上的编号（负数，不会与正常派生的子流冲突）
+    ROLLOUT_STREAM = -1
+    
+    def __init__(self, time_budget: Optional[float] = 0.05, max_rollouts: int = 64,
+                 horizon: int = 8, exploration: float = 1.4,
+                 rollout_pattern: Optional[AttackPattern] = None):
+        super().__init__("搜索", "推演候选行动之后的若干回合，选择期望结果最好的行动")
+        self.time_budget = time_budget
+        self.max_rollouts = max_rollouts
+        self.horizon = horizon
+        self.exploration = exploration
+        # 推演中敌人后续回合使用的攻击模式
+        self.rollout_pattern = rollout_pattern or RandomSkillPattern()
+        self.last_search: List[Dict[str, Any]] = []  # 最近一次决策的各候选统计
+        self._searching = False
+    
+    def get_state(self) -> Any:
+        # 自身只有推演期间的临时状态，快照只需要保存退回时使用的攻击模式
+        return self.rollout_pattern.get_state()
+    
+    def set_state(self, state: Any):
+        self.rollout_pattern.set_state(state)
+    
+    def select_action(self, attacker: BaseCharacter, target: BaseCharacter, 
+                     available_skills: List[Skill]) -> Dict[str, Any]:
+        """推演所有候选行动并选择平均评分最高的一个"""
+        context = attacker.battle_context
+        if self._searching or context is None or not context.supports_lookahead:
+            # 推演内部、不在战斗中或战斗不支持快照时退回简单模式
+            return self.rollout_pattern.select_action(attacker, target, available_skills)
+        
+        candidates = [{'type': 'attack', 'target': target}]
+        candidates.extend({'type': 'skill', 'skill': skill, 'target': target}
+                          for skill in self.get_usable_skills(attacker, available_skills))
+        if len(candidates) == 1:
+            return candidates[0]
+        return self._search(context, attacker, candidates)
+    
+    def _search(self, context, attacker: BaseCharacter,
+                candidates: List[Dict[str, Any]]) -> Dict[str, Any]:
+        from battle_system.battle_engine import BattleEngine
+        from battle_system.headless import random_policy
+        from battle_system.events import EventBus
+        from output_sink import NULL_SINK
+        
+        deadline = time.perf_counter() + self.time_budget if self.time_budget is not None else None
+        snapshot = context.snapshot()
+        # 推演中敌人也使用 rollout_pattern，推演结束后恢复它的状态，避免影响真实战斗中的退回选择
+        pattern_state = self.rollout_pattern.get_state()
+        real_rng, real_output, real_events = context.rng, context.output, context.events
+        real_policy_rng = context.policy_rng
+        rollout_rng = self._rollout_rng(context)
+        engine = BattleEngine.from_context(context, random_policy)
+        
+        count = len(candidates)
+        visits = [0] * count
+        totals = [0.0] * count
+        rollouts = 0
+        self._searching = True
+        context.bind_output(NULL_SINK)
+        context.events = EventBus()  # 推演中的事件不分发给真实战斗的订阅者
+        profiler = context.profiler
+        if profiler is not None:
+            profiler.paused += 1  # 推演中的回合和日志不计入真实战斗的阶段统计
+        try:
+            while rollouts < max(self.max_rollouts, count):
+                if rollouts < count:
+                    index = rollouts
+                elif rollouts >= self.max_rollouts or (deadline is not None and time.perf_counter() >= deadline):
+                    break
+                else:
+                    log_total = math.log(rollouts)
+                    index = max(range(count), key=lambda i: totals[i] / visits[i]
+                                + self.exploration * math.sqrt(log_total / visits[i]))
+                
+                # 推演中的玩家模型（random_policy）也从推演随机数流取值
+                context.bind_rng(rollout_rng)
+                context.policy_rng = rollout_rng
+                totals[index] += self._rollout(engine, context, attacker, candidates[index])
+                visits[index] += 1
+                rollouts += 1
+                
+                # 用真实随机数流恢复快照，推演随机数流继续向前
+                context.bind_rng(real_rng)
+                context.policy_rng = real_policy_rng
+                context.restore(snapshot)
+                self.rollout_pattern.set_state(pattern_state)
+        finally:
+            self._searching = False
+            context.bind_rng(real_rng)
+            context.policy_rng = real_policy_rng
+            context.restore(snapshot)
+            self.rollout_pattern.set_state(pattern_state)
+            context.bind_output(real_output)
+            context.events = real_events
+            if profiler is not None:
+                profiler.paused -= 1
+        
+        self.last_search = [{
+            'action': candidate['skill'].name if candidate['type'] == 'skill' else 'attack',
+            'visits': visits[i],
+            'mean': totals[i] / visits[i],
+        } for i, candidate in enumerate(candidates)]
+        best = max(range(count), key=lambda i: totals[i] / visits[i])
+        return candidates[best]
+    
+    def _rollout_rng(self, context) -> random.Random:
+        """由战斗种子和回合数派生推演用的随机数流，不消耗真实战斗的随机数"""
+        from battle_system.rng import BattleRNG
+        
+        rng = context.rng
+        if isinstance(rng, BattleRNG):
+            return BattleRNG(rng.root_seed, rng.spawn_key + (self.ROLLOUT_STREAM, context.turn_count))
+        return random.Random(context.turn_count)
+    
+    def _rollout(self, engine, context, attacker: BaseCharacter, action: Dict[str, Any]) -> float:
+        """执行候选行动并按回合规则推演 horizon 个回合，返回评分"""
+        engine._execute_enemy_action(action)
+        if not context.is_battle_over():
+            engine._end_turn()
+            for _ in range(self.horizon):
+                if context.is_battle_over():
+                    break
+                context.next_turn()
+                engine._process_turn()
+        return self._evaluate(context, attacker)
+    
+    def _evaluate(self, context, attacker: BaseCharacter) -> float:
+        """以攻击者视角评分：获胜为1，失败为-1，否则为双方剩余生命比例之差的一半"""
+        opponent = context.player if attacker is context.enemy else context.enemy
+        if attacker.hp <= 0:
+            return -1.0
+        if opponent.hp <= 0:
+            return 1.0
+        return (attacker.hp / attacker.max_hp - opponent.hp / opponent.max_hp) / 2
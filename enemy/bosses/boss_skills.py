@@ -3,6 +3,7 @@
 from enemy.bosses.goblin_chef_skills import GOBLIN_CHEF_SKILLS
 from enemy.bosses.template_boss_skills import DRAGON_BOSS_SKILLS, MAGE_BOSS_SKILLS
 from typing import Dict, List, Any
+import copy
 
 # Boss技能注册表
 BOSS_SKILLS_REGISTRY = {
@@ -20,14 +21,14 @@ def get_boss_skills(boss_name: str) -> List[Any]:
         boss_name: boss的名称标识符
         
     Returns:
-        该boss的技能列表
+        该boss的技能列表（每次调用都返回新的技能实例，冷却状态互不影响）
         
     Raises:
         KeyError: 如果boss名称不存在
     """
     if boss_name not in BOSS_SKILLS_REGISTRY:
         raise KeyError(f"Boss '{boss_name}' 的技能未找到")
-    return BOSS_SKILLS_REGISTRY[boss_name]
+    return [copy.copy(skill) for skill in BOSS_SKILLS_REGISTRY[boss_name]]
 
 def get_all_boss_names() -> List[str]:
     """获取所有已注册的boss名称
@@ -7,6 +7,8 @@ from characters.skills.base_skill import Skill
 class FloorBoss(BaseCharacter):
     """层主类 - 继承自BaseCharacter以获得状态效果支持"""
     
+    is_floor_boss = True  # 击败后记入玩家的 defeated_bosses
+    
     def __init__(self, floor: int, name: str, level: int, hp: int, attack: int, defense: int):
         super().__init__(name, level)
         self.floor = floor
@@ -58,6 +60,13 @@ class FloorBoss(BaseCharacter):
         
         return self.attack_pattern.select_action(self, target, self.skills)
     
+    def _get_extra_state(self) -> Any:
+        return (self.is_defeated, self.attack_pattern.get_state())
+    
+    def _set_extra_state(self, extra: Any):
+        self.is_defeated, pattern_state = extra
+        self.attack_pattern.set_state(pattern_state)
+    
     def execute_action(self, action: Dict[str, Any]) -> Dict[str, Any]:
         """执行选择的动作"""
         if action['type'] == 'skill':
@@ -4,7 +4,6 @@ from characters.skills.base_skill import Skill, SkillType
 from status_effects.status_effects import BurnEffect, PoisonEffect, AttackBuffEffect, StunEffect
 from characters.equipments.base_equipments import DamageType
 from typing import Dict, Any
-import random
 
 
 class SpicySeasoning(Skill):
@@ -27,7 +26,7 @@ class SpicySeasoning(Skill):
         
         # 50%几率附加灼烧
         burn_applied = False
-        if random.random() < 0.5 and target:
+        if caster.rng.random() < 0.5 and target:
             burn_effect = BurnEffect(duration=3, damage_per_turn=5)
             target.status_manager.add_status(burn_effect)
             burn_applied = True
@@ -128,7 +127,7 @@ class ChefSpecial(Skill):
         
         # 30%几率眩晕
         stun_applied = False
-        if random.random() < 0.3 and target:
+        if caster.rng.random() < 0.3 and target:
             stun_effect = StunEffect(duration=1)
             target.status_manager.add_status(stun_effect)
             stun_applied = True
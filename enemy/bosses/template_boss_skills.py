@@ -4,7 +4,6 @@ from characters.skills.base_skill import Skill, SkillType
 from status_effects.status_effects import BurnEffect, PoisonEffect, AttackBuffEffect, StunEffect, DefenseBuffEffect
 from characters.equipments.base_equipments import DamageType
 from typing import Dict, Any
-import random
 
 
 # ============= 模板技能类 =============
@@ -146,7 +145,7 @@ class SecondBossFireBreath(Skill):
         
         # 50%几率附加灼烧
         burn_applied = False
-        if random.random() < 0.5 and target:
+        if caster.rng.random() < 0.5 and target:
             burn_effect = BurnEffect(duration=3, damage_per_turn=8)
             target.status_manager.add_status(burn_effect)
             burn_applied = True
@@ -183,7 +182,7 @@ class SecondBossTailSwipe(Skill):
         
         # 25%几率眩晕
         stun_applied = False
-        if random.random() < 0.25 and target:
+        if caster.rng.random() < 0.25 and target:
             stun_effect = StunEffect(duration=1)
             target.status_manager.add_status(stun_effect)
             stun_applied = True
@@ -105,9 +105,10 @@ def get_creature_by_name(name: str, level: int = None):
         return creature_class(level)
     return None
 
-def get_random_creature_by_tier(tier: str, level: int = None):
-    """根据层级随机获取生物"""
+def get_random_creature_by_tier(tier: str, level: int = None, rng=None):
+    """根据层级随机获取生物，rng为None时使用全局random"""
     import random
+    rng = rng or random
     
     tier_map = {
         "low": LOW_LEVEL_CREATURES,
@@ -117,7 +118,7 @@ def get_random_creature_by_tier(tier: str, level: int = None):
     }
     
     if tier in tier_map and tier_map[tier]:
-        creature_name = random.choice(list(tier_map[tier].keys()))
+        creature_name = rng.choice(list(tier_map[tier].keys()))
         return get_creature_by_name(creature_name, level)
     return None
 
@@ -2,8 +2,8 @@
 
 from characters.skills.base_skill import Skill, SkillType
 from characters.equipments.base_equipments import DamageType
+from status_effects import PoisonEffect
 from typing import Dict, Any
-import random
 
 class WaterMirror(Skill):
     """水镜术 - 制造幻象分身"""
@@ -61,7 +61,8 @@ class VenomStrike(Skill):
         
         # 50%概率造成中毒
         poison_applied = False
-        if random.random() < 0.5:
+        if caster.rng.random() < 0.5:
+            target.add_status_effect(PoisonEffect(duration=3))
             poison_applied = True
         
         message = f"{caster.name}使用{self.name}，对{target.name}造成{damage}点伤害！"
@@ -2,12 +2,12 @@
 
 import sys
 import os
-import random
 from typing import Dict, List, Optional, Any
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from battle_system import BattleEngine, BattleConfig
+from battle_system.rng import BattleRNG
 from characters.base_character import BaseCharacter
 from enemy.lothir import swamp_creatures, root_creatures, canopy_creatures, undergrowth_creatures, bridge_creatures
 from enemy.bosses.boss_manager import BossManager
@@ -15,7 +15,8 @@ from enemy.bosses.boss_manager import BossManager
 class BattleEncounterManager:
     """战斗遭遇管理器"""
     
-    def __init__(self):
+    def __init__(self, rng: Optional[BattleRNG] = None):
+        self.rng = rng or BattleRNG()
         self.boss_manager = BossManager()
         self.enemy_pools = {
             "翡翠之森": {
@@ -44,7 +45,7 @@ class BattleEncounterManager:
                         possible_enemies.append(enemy)
         
         if possible_enemies:
-            return random.choice(possible_enemies)
+            return self.rng.choice(possible_enemies)
         return None
     
     def generate_boss_enemy(self, floor: int) -> Optional[Any]:
@@ -78,15 +79,17 @@ class BattleEncounterManager:
 class MapBattleSystem:
     """地图战斗系统集成"""
     
-    def __init__(self, player):
+    def __init__(self, player, seed: Optional[int] = None):
         self.player = player
-        self.encounter_manager = BattleEncounterManager()
+        # 遭遇判定与每场战斗各自使用独立的随机数子流
+        self.rng = BattleRNG(seed)
+        self.encounter_manager = BattleEncounterManager(self.rng.spawn(1)[0])
         
     def check_random_encounter(self, region: str, sub_region: str = None) -> Optional[str]:
         """检查是否触发随机遭遇"""
         chance = self.encounter_manager.calculate_encounter_chance(region, sub_region)
         
-        if random.random() < chance:
+        if self.rng.random() < chance:
             return self.trigger_encounter(region, sub_region)
         return None
     
@@ -117,7 +120,7 @@ class MapBattleSystem:
             )
             
             # 开始战斗
-            battle = BattleEngine(self.player, enemy, config)
+            battle = BattleEngine(self.player, enemy, config, rng=self.rng.spawn(1)[0])
             result = battle.start_battle()
             
             # 处理战斗结果
@@ -139,7 +142,7 @@ class MapBattleSystem:
                 turn_limit=100
             )
             
-            battle = BattleEngine(self.player, boss, config)
+            battle = BattleEngine(self.player, boss, config, rng=self.rng.spawn(1)[0])
             result = battle.start_battle()
             
             return self._process_battle_result(result, boss, is_boss=True)
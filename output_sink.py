@@ -0,0 +1,99 @@
+"""
+文本输出接口
+战斗、角色、装备和状态效果的所有文字输出都通过输出接口，而不是直接调用print，
+以便在批量模拟中静默、缓冲或结构化记录这些输出
+"""
+
+import sys
+from typing import Any, Callable, Dict, List, Optional
+
+
+class OutputSink:
+    """输出接口基类
+
+    调用方在生成较贵的文本前应先检查 enabled，为False时可以完全跳过格式化。
+    write() 的关键字参数是结构化字段（如 kind、actor、amount），文本输出会忽略它们。
+    """
+
+    enabled = True
+
+    def write(self, message: str, **fields: Any) -> None:
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        """把缓冲的内容输出（无缓冲的实现为空操作）"""
+        pass
+
+    def __call__(self, *args: Any, sep: str = " ", **fields: Any) -> None:
+        """与print相似的调用方式"""
+        self.write(sep.join(str(arg) for arg in args), **fields)
+
+
+class ConsoleSink(OutputSink):
+    """直接输出到控制台"""
+
+    def write(self, message: str, **fields: Any) -> None:
+        print(message)
+
+
+class NullSink(OutputSink):
+    """丢弃所有输出"""
+
+    enabled = False
+
+    def write(self, message: str, **fields: Any) -> None:
+        pass
+
+    def __call__(self, *args: Any, **fields: Any) -> None:
+        pass
+
+
+class BufferedSink(OutputSink):
+    """缓冲输出，在flush时一次性写出（战斗引擎每回合结束时flush一次）"""
+
+    def __init__(self, stream=None):
+        self.stream = stream
+        self.lines: List[str] = []
+
+    def write(self, message: str, **fields: Any) -> None:
+        self.lines.append(message)
+
+    def flush(self) -> None:
+        if self.lines:
+            stream = self.stream or sys.stdout
+            stream.write("\n".join(self.lines) + "\n")
+            self.lines.clear()
+
+
+class EventSink(OutputSink):
+    """把每次输出记录为结构化事件（消息文本加上调用方提供的字段）"""
+
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+
+    def write(self, message: str, **fields: Any) -> None:
+        fields["message"] = message
+        self.events.append(fields)
+
+
+class CallableSink(OutputSink):
+    """把普通的print风格函数包装为输出接口"""
+
+    def __init__(self, func: Callable[..., None]):
+        self.func = func
+
+    def write(self, message: str, **fields: Any) -> None:
+        self.func(message)
+
+
+CONSOLE_SINK = ConsoleSink()
+NULL_SINK = NullSink()
+
+
+def as_sink(output: Optional[Any]) -> OutputSink:
+    """把None、输出接口或print风格函数统一转换为输出接口"""
+    if output is None or output is print:
+        return CONSOLE_SINK
+    if isinstance(output, OutputSink):
+        return output
+    return CallableSink(output)
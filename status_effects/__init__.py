@@ -2,6 +2,8 @@
 
 from .base_status import BaseStatusEffect, StatusType, StatusPriority
 from .status_manager import StatusManager
+from .status_registry import StatusRegistry, STATUS_REGISTRY
+from .status_compiler import compile_status, compile_status_table, load_status_table
 from .status_effects import *
 
 __all__ = [
@@ -9,6 +11,12 @@ __all__ = [
     'StatusType', 
     'StatusPriority',
     'StatusManager',
+    'StatusRegistry',
+    'STATUS_REGISTRY',
+    'STATUS_TABLE',
+    'compile_status',
+    'compile_status_table',
+    'load_status_table',
     'BurnEffect',
     'PoisonEffect',
     'FreezeEffect',
@@ -2,8 +2,8 @@
 
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import Dict, Any, Optional
-from dataclasses import dataclass
+from typing import Dict, Any, Optional, Tuple
+from dataclasses import dataclass, replace
 
 
 class StatusType(Enum):
@@ -23,29 +23,58 @@ class StatusPriority(Enum):
     HIGHEST = 4
 
 
-@dataclass
+@dataclass(frozen=True)
 class StatusEffectData:
-    """状态效果数据容器"""
+    """状态效果的静态描述（不可变，同类效果共享同一个对象）"""
     name: str
     duration: int
     max_stacks: int = 1
     refresh_on_reapply: bool = True
-    exclusive_with: list = None
+    exclusive_with: tuple = ()
     
     def __post_init__(self):
-        if self.exclusive_with is None:
-            self.exclusive_with = []
+        if not isinstance(self.exclusive_with, tuple):
+            object.__setattr__(self, "exclusive_with", tuple(self.exclusive_with or ()))
+
+
+# (效果类, 持续时间) -> 持续时间与类默认值不同时共享的静态描述
+_INTERNED_DATA: Dict[Tuple[type, int], StatusEffectData] = {}
 
 
 class BaseStatusEffect(ABC):
-    """状态效果基类"""
+    """状态效果基类
+    
+    名称、层数上限、刷新规则和互斥列表放在类属性 DATA 中，所有实例共享；
+    实例只通过 __slots__ 保存可变状态（剩余回合、层数、是否生效）和子类的数值字段。
+    """
+    
+    __slots__ = ("data", "remaining_duration", "stacks", "is_active")
+    
+    # 子类的静态描述，duration 为默认持续时间
+    DATA: Optional[StatusEffectData] = None
     
-    def __init__(self, data: StatusEffectData):
-        self.data = data
-        self.remaining_duration = data.duration
+    # 子类在施加/结算过程中会改变的额外属性，参与 get_state()/set_state()
+    state_fields: tuple = ()
+    
+    def __init__(self, data: Optional[StatusEffectData] = None, duration: Optional[int] = None):
+        """data 为空时使用类的共享描述 DATA，duration 覆盖其默认持续时间"""
+        self.data = data if data is not None else self.shared_data(duration)
+        self.remaining_duration = self.data.duration
         self.stacks = 1
         self.is_active = True
         
+    @classmethod
+    def shared_data(cls, duration: Optional[int] = None) -> StatusEffectData:
+        """返回该类共享的静态描述；持续时间与默认值不同时按 (类, 持续时间) 缓存一份"""
+        data = cls.DATA
+        if duration is None or duration == data.duration:
+            return data
+        key = (cls, duration)
+        interned = _INTERNED_DATA.get(key)
+        if interned is None:
+            interned = _INTERNED_DATA[key] = replace(data, duration=duration)
+        return interned
+    
     @property
     def name(self) -> str:
         return self.data.name
@@ -116,6 +145,17 @@ class BaseStatusEffect(ABC):
         stack_text = f" ({self.stacks}层)" if self.stacks > 1 else ""
         return f"{self.name}{stack_text} - 剩余{self.remaining_duration}回合"
     
+    def get_state(self) -> tuple:
+        """获取可变状态（剩余回合、层数、是否生效及 state_fields），用于战斗快照"""
+        return (self.remaining_duration, self.stacks, self.is_active) + tuple(
+            getattr(self, name) for name in self.state_fields)
+    
+    def set_state(self, state: tuple):
+        """恢复 get_state() 记录的状态"""
+        self.remaining_duration, self.stacks, self.is_active = state[:3]
+        for name, value in zip(self.state_fields, state[3:]):
+            setattr(self, name, value)
+    
     def to_dict(self) -> Dict[str, Any]:
         """序列化为字典"""
         return {
@@ -0,0 +1,288 @@
+"""状态效果编译器 - 把声明式的状态定义编译成 BaseStatusEffect 子类
+
+一条状态定义是一个可以直接写成JSON的字典：
+
+    {
+        "class": "BurnEffect",              # 生成的类名
+        "name": "灼烧",
+        "description": "灼烧效果 - 每回合造成固定伤害",
+        "type": "dot",                      # StatusType 的值
+        "priority": "MEDIUM",               # StatusPriority 的成员名
+        "duration": 3, "max_stacks": 3, "refresh_on_reapply": True,
+        "exclusive_with": ["冰冻"],
+        "params": {"damage_per_turn": 10},  # 构造参数（持续时间之后，按顺序）及默认值
+        "control": [],                      # 施加和每回合置为 False、移除时恢复的角色标志
+        "modifies": None,                   # 施加时增加 apply.amount、移除时恢复原值的角色属性
+        "apply": {"amount": ..., "message": ...},
+        "tick": {"effect": "damage", "amount": "damage_per_turn * stacks",
+                 "message": "{character} 受到 {amount} 点灼烧伤害"},
+        "remove": {"message": ...},
+    }
+
+除 class / name / type / priority / duration 外均可省略。amount 是只含四则运算、
+int/min/max/abs/round 的表达式，可以使用 stacks、params 中的参数以及角色的
+hp / max_hp / mp / max_mp / attack / defense / spell_power；message 是 str.format
+风格的模板，可以使用 {character}（角色名）、{amount} 和 params 中的参数。
+
+编译时每个表达式和模板都被改写成直接的属性访问，和整个方法一起生成一次源码，
+运行时不再有 super() 调用和字典合并。没有 tick 和 control 的状态不生成 on_tick，
+由 StatusManager 作为被动效果放入时间轮。
+只造成伤害或治疗（没有 control）的状态另外带有 compiled_tick，向量化内核
+（battle_system.vectorized）据此用数组一次结算整批战斗中的同一种效果。
+"""
+
+import ast
+import json
+import keyword
+import string
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .base_status import BaseStatusEffect, StatusEffectData, StatusType, StatusPriority
+
+# 表达式中可用的角色属性和函数
+CHARACTER_FIELDS = ("hp", "max_hp", "mp", "max_mp", "attack", "defense", "spell_power")
+EXPRESSION_FUNCTIONS = ("int", "min", "max", "abs", "round")
+TICK_EFFECTS = ("damage", "heal")
+CONTROL_FLAGS = ("can_act", "can_cast")
+
+DEFINITION_KEYS = {"class", "name", "description", "type", "priority", "duration", "max_stacks",
+                   "refresh_on_reapply", "exclusive_with", "params", "control", "modifies",
+                   "apply", "tick", "remove"}
+
+_ALLOWED_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant, ast.Name, ast.Load,
+                  ast.Call, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod,
+                  ast.USub, ast.UAdd)
+
+
+@dataclass(frozen=True, eq=False)
+class CompiledTick:
+    """只造成伤害/治疗的每回合结算规则"""
+    effect: str                  # "damage" 或 "heal"
+    formula: str                 # 校验过的 amount 表达式（改写前）
+    params: tuple                # 表达式可用的构造参数
+    on_tick: Callable            # 生成的 on_tick，子类重写 on_tick 后规则不再适用
+
+
+class _Rewriter(ast.NodeTransformer):
+    """把表达式中的名称改写为效果/角色上的属性访问"""
+
+    def __init__(self, params: Iterable[str]):
+        self.params = set(params)
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if node.id == "stacks" or node.id in self.params:
+            owner = "self"
+        elif node.id in CHARACTER_FIELDS:
+            owner = "character"
+        else:
+            return node
+        return ast.copy_location(
+            ast.Attribute(value=ast.Name(id=owner, ctx=ast.Load()), attr=node.id, ctx=ast.Load()), node)
+
+
+def _compile_expression(source: str, params: Iterable[str], where: str) -> ast.expr:
+    """校验并改写 amount 表达式，返回改写后的语法树"""
+    try:
+        tree = ast.parse(str(source), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"{where}: 表达式语法错误 {source!r}") from e
+    params = tuple(params)
+    allowed_names = {"stacks", *params, *CHARACTER_FIELDS}
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"{where}: 表达式中不支持 {type(node).__name__}: {source!r}")
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in EXPRESSION_FUNCTIONS or node.keywords:
+                raise ValueError(f"{where}: 表达式只能调用 {', '.join(EXPRESSION_FUNCTIONS)}: {source!r}")
+        elif isinstance(node, ast.Name) and node.id not in allowed_names and node.id not in EXPRESSION_FUNCTIONS:
+            raise ValueError(f"{where}: 表达式中未知的名称 {node.id!r}: {source!r}")
+        elif isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+            raise ValueError(f"{where}: 表达式中只能使用数字常量: {source!r}")
+    return _Rewriter(params).visit(tree).body
+
+
+def _compile_message(template: str, params: Iterable[str], where: str, has_amount: bool) -> str:
+    """把消息模板改写为 f-string 源码"""
+    params = set(params)
+    values: List[ast.expr] = []
+    try:
+        parts = list(string.Formatter().parse(template))
+    except ValueError as e:
+        raise ValueError(f"{where}: 消息模板格式错误 {template!r}") from e
+    for literal, field, spec, conversion in parts:
+        if literal:
+            values.append(ast.Constant(literal))
+        if field is None:
+            continue
+        if field == "character":
+            value = ast.Attribute(value=ast.Name(id="character", ctx=ast.Load()), attr="name", ctx=ast.Load())
+        elif field == "amount" and has_amount:
+            value = ast.Name(id="amount", ctx=ast.Load())
+        elif field in params:
+            value = ast.Attribute(value=ast.Name(id="self", ctx=ast.Load()), attr=field, ctx=ast.Load())
+        else:
+            raise ValueError(f"{where}: 消息模板中未知的字段 {{{field}}}: {template!r}")
+        values.append(ast.FormattedValue(
+            value=value, conversion=ord(conversion) if conversion else -1,
+            format_spec=ast.JoinedStr([ast.Constant(spec)]) if spec else None))
+    return ast.unparse(ast.JoinedStr(values))
+
+
+def _result(message: str, extra: Optional[str] = None) -> str:
+    entries = f'"success": True, "message": {message}'
+    if extra:
+        entries += f', "{extra}": amount'
+    return "{" + entries + "}"
+
+
+def compile_status(definition: Dict[str, Any], module: Optional[str] = None) -> type:
+    """把一条状态定义编译成 BaseStatusEffect 子类"""
+    class_name = definition.get("class")
+    where = f"状态定义 {class_name or definition.get('name')!r}"
+    unknown = set(definition) - DEFINITION_KEYS
+    if unknown:
+        raise ValueError(f"{where}: 未知的字段 {sorted(unknown)}")
+    for key in ("class", "name", "type", "priority", "duration"):
+        if key not in definition:
+            raise ValueError(f"{where}: 缺少字段 {key!r}")
+    if not class_name.isidentifier() or keyword.iskeyword(class_name):
+        raise ValueError(f"{where}: 类名必须是合法的标识符")
+
+    try:
+        status_type = StatusType(definition["type"])
+        priority = StatusPriority[definition["priority"]]
+    except (ValueError, KeyError) as e:
+        raise ValueError(f"{where}: 未知的状态类型或优先级") from e
+
+    params: Dict[str, Any] = dict(definition.get("params") or {})
+    for param in params:
+        if (not param.isidentifier() or keyword.iskeyword(param) or param in CHARACTER_FIELDS
+                or param == "duration" or hasattr(BaseStatusEffect, param)):
+            raise ValueError(f"{where}: 非法的参数名 {param!r}")
+    control = tuple(definition.get("control") or ())
+    if not set(control) <= set(CONTROL_FLAGS):
+        raise ValueError(f"{where}: control 只能包含 {CONTROL_FLAGS}")
+    modifies = definition.get("modifies")
+    apply = definition.get("apply") or {}
+    tick = definition.get("tick")
+    remove = definition.get("remove") or {}
+    if modifies is not None and (modifies not in CHARACTER_FIELDS or "amount" not in apply):
+        raise ValueError(f"{where}: modifies 必须是角色属性，且需要 apply.amount")
+
+    original = f"original_{modifies}" if modifies else None
+    slots = tuple(params) + ((original,) if original else ())
+    lines: List[str] = []
+
+    # __init__：默认值通过 __defaults__ 设置
+    signature = ", ".join(("self", "duration") + tuple(params))
+    lines.append(f"def __init__({signature}):")
+    lines.append("    _base_init(self, None, duration)")
+    for param in params:
+        lines.append(f"    self.{param} = {param}")
+    if original:
+        lines.append(f"    self.{original} = None")
+
+    def amount_line(section: Dict[str, Any], label: str) -> List[str]:
+        if "amount" not in section:
+            return []
+        expr = _compile_expression(section["amount"], params, f"{where} {label}.amount")
+        return [f"    amount = {ast.unparse(expr)}"]
+
+    def message(section: Dict[str, Any], label: str, default: str) -> str:
+        template = section.get("message")
+        if template is None:
+            return repr(default)
+        return _compile_message(template, params, f"{where} {label}.message", "amount" in section)
+
+    if apply or control or modifies:
+        lines.append("def on_apply(self, character):")
+        lines.extend(amount_line(apply, "apply"))
+        for flag in control:
+            lines.append(f"    character.{flag} = False")
+        if modifies:
+            lines.append(f"    self.{original} = character.{modifies}")
+            lines.append(f"    character.{modifies} += amount")
+        lines.append(f"    return {_result(message(apply, 'apply', definition['name'] + ' 已施加'))}")
+
+    if tick is not None or control:
+        tick = tick or {}
+        effect = tick.get("effect")
+        if effect is not None and (effect not in TICK_EFFECTS or "amount" not in tick):
+            raise ValueError(f"{where}: tick.effect 必须是 {TICK_EFFECTS} 之一并提供 amount")
+        lines.append("def on_tick(self, character):")
+        for flag in control:
+            lines.append(f"    character.{flag} = False")
+        lines.extend(amount_line(tick, "tick"))
+        if effect == "damage":
+            lines.append("    character.take_damage(amount, _MAGICAL)")
+        elif effect == "heal":
+            lines.append("    character.heal(amount)")
+        lines.append("    self.remaining_duration -= 1")
+        lines.append("    if self.remaining_duration <= 0:")
+        lines.append("        self.is_active = False")
+        default_message = definition["name"] + " 持续中"
+        lines.append(f"    return {_result(message(tick, 'tick', default_message), effect)}")
+
+    if remove or control or modifies:
+        lines.append("def on_remove(self, character):")
+        for flag in control:
+            lines.append(f"    character.{flag} = True")
+        if modifies:
+            lines.append(f"    if self.{original} is not None:")
+            lines.append(f"        character.{modifies} = self.{original}")
+        if "amount" in remove:
+            raise ValueError(f"{where}: remove 不支持 amount")
+        lines.append(f"    return {_result(message(remove, 'remove', definition['name'] + ' 已移除'))}")
+
+    from characters.equipments.base_equipments import DamageType
+    namespace: Dict[str, Any] = {}
+    exec("\n".join(lines), {"_base_init": BaseStatusEffect.__init__, "_MAGICAL": DamageType.MAGICAL}, namespace)
+    namespace["__init__"].__defaults__ = (definition["duration"],) + tuple(params.values())
+
+    attributes = {
+        "__slots__": slots,
+        "__doc__": definition.get("description", definition["name"]),
+        "DATA": StatusEffectData(
+            name=definition["name"],
+            duration=definition["duration"],
+            max_stacks=definition.get("max_stacks", 1),
+            refresh_on_reapply=definition.get("refresh_on_reapply", True),
+            exclusive_with=tuple(definition.get("exclusive_with") or ()),
+        ),
+        "state_fields": (original,) if original else (),
+        "definition": definition,
+        "get_status_type": lambda self: status_type,
+        "get_priority": lambda self: priority,
+    }
+    attributes.update(namespace)
+    if module is not None:
+        attributes["__module__"] = module
+    cls = type(class_name, (BaseStatusEffect,), attributes)
+    for name in namespace:
+        function = getattr(cls, name)
+        function.__qualname__ = f"{class_name}.{name}"
+        if module is not None:
+            function.__module__ = module
+    if tick is not None and tick.get("effect") is not None and not control:
+        cls.compiled_tick = CompiledTick(effect=tick["effect"], formula=str(tick["amount"]),
+                                         params=tuple(params), on_tick=namespace["on_tick"])
+    return cls
+
+
+def compile_status_table(definitions: Iterable[Dict[str, Any]],
+                         module: Optional[str] = None) -> Dict[str, type]:
+    """编译一组状态定义，返回 类名 -> 状态类"""
+    compiled: Dict[str, type] = {}
+    for definition in definitions:
+        cls = compile_status(definition, module)
+        if cls.__name__ in compiled:
+            raise ValueError(f"状态定义重复的类名: {cls.__name__}")
+        compiled[cls.__name__] = cls
+    return compiled
+
+
+def load_status_table(path: str) -> Dict[str, type]:
+    """从JSON文件（状态定义列表）编译状态类"""
+    with open(path, "r", encoding="utf-8") as f:
+        return compile_status_table(json.load(f))
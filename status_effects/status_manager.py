@@ -1,76 +1,142 @@
 """状态效果管理器"""
 
+import bisect
 from typing import List, Dict, Any, Optional, Type
 from .base_status import BaseStatusEffect, StatusType, StatusPriority
+from .status_registry import STATUS_REGISTRY
+
+# 由管理器增量维护总值的效果属性，get_total_effect_value 查询这些属性为 O(1)
+AGGREGATED_STATS = ('hp_bonus', 'attack_bonus', 'defense_bonus', 'mp_bonus',
+                    'spell_power_bonus', 'speed_reduction', 'dodge_chance')
 
 
 class StatusManager:
-    """集中管理角色的所有状态效果"""
+    """集中管理角色的所有状态效果
+    
+    效果按 (优先级, 名称) 从高到低排列，相同键按施加顺序排列。每个排序键对应一个
+    按插入顺序排列的桶，排序键列表用二分插入维护（O(log n)）；另有按状态类型和名称的索引。
+    效果对象本身就是句柄，按句柄移除为 O(1)。
+    互斥检查用当前存在的状态类位掩码与 STATUS_REGISTRY 预先计算的互斥矩阵按位与，
+    合并查找直接取同类效果索引，施加状态与已有效果数量无关。
+    
+    每回合结算时只访问重写了 on_tick 的效果（持续伤害、持续治疗、控制等）。
+    没有每回合行为的效果（属性增益等）按到期回合放入时间轮，只在施加、刷新和到期时处理；
+    它们的 remaining_duration 在被读取（遍历、查询、快照）前按已经过的回合数补齐。
+    """
     
     def __init__(self, character):
         self.character = character
-        self.status_effects: List[BaseStatusEffect] = []
-        self._status_cache: Dict[str, BaseStatusEffect] = {}
+        self._keys: List[tuple] = []                          # 升序排列的排序键
+        self._buckets: Dict[tuple, Dict[BaseStatusEffect, None]] = {}
+        self._entries: Dict[BaseStatusEffect, tuple] = {}     # 效果 -> 排序键
+        self._by_type: Dict[StatusType, Dict[BaseStatusEffect, None]] = {}
+        self._by_name: Dict[str, Dict[BaseStatusEffect, None]] = {}
+        self._by_class: Dict[type, Dict[BaseStatusEffect, None]] = {}
+        self._active_mask = 0                                 # 当前存在的状态类（注册表编号的位）
+        # 各属性的 数值×层数 总和，以及每个效果提供的 (属性, 数值)
+        self._totals: Dict[str, float] = dict.fromkeys(AGGREGATED_STATS, 0.0)
+        self._contributions: Dict[BaseStatusEffect, tuple] = {}
+        # 需要每回合结算的效果，结构与 _keys/_buckets 相同
+        self._tick_keys: List[tuple] = []
+        self._tick_buckets: Dict[tuple, Dict[BaseStatusEffect, None]] = {}
+        # 时间轮：到期回合 -> 效果；被动效果 -> (记录时的回合, 当时的剩余回合, 到期回合)
+        self._turn = 0
+        self._wheel: Dict[int, Dict[BaseStatusEffect, None]] = {}
+        self._scheduled: Dict[BaseStatusEffect, tuple] = {}
+        self._order: Dict[BaseStatusEffect, int] = {}         # 效果 -> 施加序号
+        self._next_order = 0
+    
+    @property
+    def status_effects(self) -> List[BaseStatusEffect]:
+        """按结算顺序排列的全部效果（新建列表）"""
+        return list(self)
     
     def add_status(self, effect: BaseStatusEffect) -> Dict[str, Any]:
         """添加状态效果"""
         # 检查互斥状态
-        for existing in self.status_effects:
-            if not effect.can_stack_with(existing):
-                return {
-                    "success": False, 
-                    "message": f"无法施加 {effect.name}，与 {existing.name} 互斥"
-                }
+        blocking = self._active_mask & STATUS_REGISTRY.blocked_by(STATUS_REGISTRY.register(effect))
+        if blocking:
+            existing = self._first_blocking(blocking)
+            return {
+                "success": False, 
+                "message": f"无法施加 {effect.name}，与 {existing.name} 互斥"
+            }
         
         # 检查是否已存在相同类型的效果
-        for existing in self.status_effects:
-            if type(existing) == type(effect):
+        same_class = self._by_class.get(type(effect))
+        if same_class:
+            for existing in same_class:
+                stacks = existing.stacks
+                self._settle(existing)
                 if existing.merge(effect):
+                    if existing.stacks != stacks:
+                        self._account(existing, existing.stacks - stacks)
+                    if existing in self._scheduled:
+                        self._unschedule(existing)
+                        self._schedule(existing)
+                    self._notify_applied(existing)
                     return {
                         "success": True,
                         "message": f"{effect.name} 已刷新/叠加",
                         "refreshed": True
                     }
         
-        # 添加新状态
-        self.status_effects.append(effect)
-        self._status_cache[effect.name] = effect
-        
-        # 按优先级排序
-        self._sort_by_priority()
+        # 添加新状态（按优先级插入）
+        self._insert(effect)
         
         # 触发应用事件
         result = effect.on_apply(self.character)
+        self._notify_applied(effect)
         return {
             "success": True,
             "message": result.get("message", f"{effect.name} 已施加"),
             "new_effect": True
         }
     
+    def _notify_applied(self, effect: BaseStatusEffect):
+        """战斗中通知所在战斗的上下文（发布StatusApplied事件）"""
+        context = getattr(self.character, "battle_context", None)
+        if context is not None:
+            context.status_applied(self.character, effect)
+    
     def remove_status(self, effect_name: str) -> Dict[str, Any]:
-        """移除指定状态效果"""
-        for effect in self.status_effects:
-            if effect.name == effect_name:
-                result = effect.on_remove(self.character)
-                self.status_effects.remove(effect)
-                if effect_name in self._status_cache:
-                    del self._status_cache[effect_name]
-                return {
-                    "success": True,
-                    "message": result.get("message", f"{effect_name} 已移除")
-                }
+        """移除指定名称的状态效果（同名效果中最早施加的一个）"""
+        effects = self._by_name.get(effect_name)
+        if effects:
+            return self.remove_effect(next(iter(effects)))
         
         return {
             "success": False,
             "message": f"未找到状态效果: {effect_name}"
         }
     
+    def remove_effect(self, effect: BaseStatusEffect) -> Dict[str, Any]:
+        """按句柄（效果对象）移除状态效果"""
+        if effect not in self._entries:
+            return {
+                "success": False,
+                "message": f"未找到状态效果: {effect.name}"
+            }
+        self._settle(effect)
+        result = effect.on_remove(self.character)
+        self._discard(effect)
+        return {
+            "success": True,
+            "message": result.get("message", f"{effect.name} 已移除")
+        }
+    
     def update_all(self) -> List[Dict[str, Any]]:
-        """更新所有状态效果（每回合调用）"""
+        """更新所有状态效果（每回合调用）
+        
+        返回重写了 on_tick 的效果的结算结果，其后是本回合到期移除的效果
+        （{"effect": 名称, "result": on_remove的结果, "expired": True}）；
+        被动效果每回合不产生结算结果，只在到期时出现在移除项中。
+        """
         results = []
         expired_effects = []
+        self._turn += 1
         
-        for effect in self.status_effects:
+        for effect in list(self._iter_ticking()):
             if effect.is_active:
                 result = effect.on_tick(self.character)
                 results.append({
@@ -81,36 +147,61 @@ class StatusManager:
                 if not effect.is_active:
                     expired_effects.append(effect)
         
+        due = self._wheel.pop(self._turn, None)
+        if due:
+            for effect in due:
+                self._settle(effect)
+                effect.is_active = False
+                del self._scheduled[effect]
+            if expired_effects:
+                # 与每回合结算的效果一起按结算顺序移除
+                entries, order = self._entries, self._order
+                expired_effects.extend(due)
+                expired_effects.sort(key=lambda e: (entries[e], -order[e]), reverse=True)
+            else:
+                expired_effects = list(due)
+        
         # 移除过期状态
         for effect in expired_effects:
-            effect.on_remove(self.character)
-            self.status_effects.remove(effect)
-            if effect.name in self._status_cache:
-                del self._status_cache[effect.name]
+            results.append({
+                "effect": effect.name,
+                "result": effect.on_remove(self.character),
+                "expired": True
+            })
+            self._discard(effect)
         
         return results
     
     def get_status_by_type(self, status_type: StatusType) -> List[BaseStatusEffect]:
-        """获取指定类型的所有状态效果"""
-        return [effect for effect in self.status_effects 
-                if effect.get_status_type() == status_type]
+        """获取指定类型的所有状态效果（按结算顺序）"""
+        effects = self._by_type.get(status_type)
+        if not effects:
+            return []
+        for effect in effects:
+            self._settle(effect)
+        entries = self._entries
+        return sorted(effects, key=entries.__getitem__, reverse=True)
     
     def get_status_by_name(self, name: str) -> Optional[BaseStatusEffect]:
-        """通过名称获取状态效果"""
-        return self._status_cache.get(name)
+        """通过名称获取状态效果（同名效果中最近施加的一个）"""
+        effects = self._by_name.get(name)
+        if not effects:
+            return None
+        effect = next(reversed(effects))
+        self._settle(effect)
+        return effect
     
     def has_status(self, name: str) -> bool:
         """检查是否拥有指定状态效果"""
-        return name in self._status_cache
+        return name in self._by_name
     
     def clear_all_status(self) -> Dict[str, Any]:
         """清除所有状态效果"""
-        removed_count = len(self.status_effects)
-        for effect in self.status_effects:
+        removed_count = len(self)
+        for effect in self:
             effect.on_remove(self.character)
         
-        self.status_effects.clear()
-        self._status_cache.clear()
+        self._reset_indexes()
         
         return {
             "success": True,
@@ -118,9 +209,12 @@ class StatusManager:
         }
     
     def get_total_effect_value(self, effect_type: str) -> float:
-        """获取指定类型效果的总值"""
+        """获取指定类型效果的总值（AGGREGATED_STATS 中的属性直接返回维护的总和）"""
+        total = self._totals.get(effect_type)
+        if total is not None:
+            return total
         total = 0.0
-        for effect in self.status_effects:
+        for effect in self:
             if hasattr(effect, effect_type):
                 total += getattr(effect, effect_type) * effect.stacks
         return total
@@ -128,27 +222,176 @@ class StatusManager:
     def get_status_summary(self) -> Dict[str, Any]:
         """获取状态效果摘要"""
         summary = {
-            "total_effects": len(self.status_effects),
+            "total_effects": len(self),
             "effects": []
         }
         
-        for effect in self.status_effects:
+        for effect in self:
             summary["effects"].append(effect.to_dict())
         
         return summary
     
-    def _sort_by_priority(self):
-        """按优先级排序状态效果"""
-        self.status_effects.sort(
-            key=lambda x: (x.get_priority().value, x.name),
-            reverse=True
-        )
+    def snapshot(self) -> tuple:
+        """记录当前所有状态效果及其可变状态（不复制效果对象）"""
+        return tuple((effect, effect.get_state()) for effect in self)
+    
+    def restore(self, snapshot: tuple):
+        """恢复到 snapshot() 时的状态效果列表（不触发 on_apply/on_remove）"""
+        self._reset_indexes()
+        for effect, state in snapshot:
+            effect.set_state(state)
+            self._insert(effect)
+    
+    def _insert(self, effect: BaseStatusEffect):
+        """把效果放入排序桶和各索引（每回合结算桶或时间轮），并计入属性总和"""
+        key = (effect.get_priority().value, effect.name)
+        self._bucket_add(self._keys, self._buckets, key, effect)
+        self._entries[effect] = key
+        self._order[effect] = self._next_order
+        self._next_order += 1
+        if STATUS_REGISTRY.has_tick(STATUS_REGISTRY.register(effect)):
+            self._bucket_add(self._tick_keys, self._tick_buckets, key, effect)
+        else:
+            self._schedule(effect)
+        self._by_type.setdefault(effect.get_status_type(), {})[effect] = None
+        self._by_name.setdefault(effect.name, {})[effect] = None
+        same_class = self._by_class.get(type(effect))
+        if same_class is None:
+            same_class = self._by_class[type(effect)] = {}
+            self._active_mask |= 1 << STATUS_REGISTRY.register(effect)
+        same_class[effect] = None
+        self._contributions[effect] = tuple(
+            (stat, getattr(effect, stat)) for stat in AGGREGATED_STATS if hasattr(effect, stat))
+        self._account(effect, effect.stacks)
+    
+    def _discard(self, effect: BaseStatusEffect):
+        """把效果移出排序桶和各索引，并扣除其属性值"""
+        key = self._entries.pop(effect)
+        del self._order[effect]
+        self._bucket_remove(self._keys, self._buckets, key, effect)
+        if STATUS_REGISTRY.has_tick(STATUS_REGISTRY.register(effect)):
+            self._bucket_remove(self._tick_keys, self._tick_buckets, key, effect)
+        elif effect in self._scheduled:
+            self._unschedule(effect)
+        self._remove_from_index(self._by_type, effect.get_status_type(), effect)
+        self._remove_from_index(self._by_name, effect.name, effect)
+        same_class = self._by_class[type(effect)]
+        del same_class[effect]
+        if not same_class:
+            del self._by_class[type(effect)]
+            self._active_mask &= ~(1 << STATUS_REGISTRY.register(effect))
+        
+        self._account(effect, -effect.stacks)
+        del self._contributions[effect]
+        if not self._contributions:
+            # 没有效果时归零，避免浮点数值反复加减后残留误差
+            self._totals = dict.fromkeys(AGGREGATED_STATS, 0.0)
+    
+    @staticmethod
+    def _bucket_add(keys: List[tuple], buckets: Dict[tuple, Dict[BaseStatusEffect, None]],
+                    key: tuple, effect: BaseStatusEffect):
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = {}
+            bisect.insort(keys, key)
+        bucket[effect] = None
+    
+    @staticmethod
+    def _bucket_remove(keys: List[tuple], buckets: Dict[tuple, Dict[BaseStatusEffect, None]],
+                       key: tuple, effect: BaseStatusEffect):
+        bucket = buckets[key]
+        del bucket[effect]
+        if not bucket:
+            del buckets[key]
+            del keys[bisect.bisect_left(keys, key)]
+    
+    def _schedule(self, effect: BaseStatusEffect):
+        """把生效中的被动效果按到期回合放入时间轮（未生效的效果不会被结算，也不会到期）"""
+        if not effect.is_active:
+            return
+        remaining = effect.remaining_duration
+        expires = self._turn + max(remaining, 1)
+        self._scheduled[effect] = (self._turn, remaining, expires)
+        self._wheel.setdefault(expires, {})[effect] = None
+    
+    def _unschedule(self, effect: BaseStatusEffect):
+        expires = self._scheduled.pop(effect)[2]
+        due = self._wheel[expires]
+        del due[effect]
+        if not due:
+            del self._wheel[expires]
+    
+    def _settle(self, effect: BaseStatusEffect):
+        """把被动效果的 remaining_duration 补齐到当前回合"""
+        scheduled = self._scheduled.get(effect)
+        if scheduled is not None and scheduled[0] != self._turn:
+            turn, remaining, expires = scheduled
+            effect.remaining_duration = remaining - (self._turn - turn)
+            self._scheduled[effect] = (self._turn, effect.remaining_duration, expires)
+    
+    def _iter_ticking(self):
+        """按结算顺序遍历需要每回合结算的效果"""
+        buckets = self._tick_buckets
+        for key in reversed(self._tick_keys):
+            yield from buckets[key]
+    
+    @staticmethod
+    def _remove_from_index(index: Dict[Any, Dict[BaseStatusEffect, None]], key: Any,
+                           effect: BaseStatusEffect):
+        effects = index[key]
+        del effects[effect]
+        if not effects:
+            del index[key]
+    
+    def _reset_indexes(self):
+        self._keys = []
+        self._buckets = {}
+        self._entries = {}
+        self._by_type = {}
+        self._by_name = {}
+        self._by_class = {}
+        self._active_mask = 0
+        self._totals = dict.fromkeys(AGGREGATED_STATS, 0.0)
+        self._contributions = {}
+        self._tick_keys = []
+        self._tick_buckets = {}
+        self._wheel = {}
+        self._scheduled = {}
+        self._order = {}
+    
+    def _first_blocking(self, blocking: int) -> BaseStatusEffect:
+        """按结算顺序返回第一个属于 blocking 掩码中状态类的效果"""
+        best_key = None
+        remaining = blocking
+        while remaining:
+            low = remaining & -remaining
+            remaining ^= low
+            for effect in self._by_class[STATUS_REGISTRY.status_class(low.bit_length() - 1)]:
+                key = self._entries[effect]
+                if best_key is None or key > best_key:
+                    best_key = key
+        # 同一排序键下可能有多个状态类，按施加顺序取第一个
+        for effect in self._buckets[best_key]:
+            if blocking & (1 << STATUS_REGISTRY.register(effect)):
+                return effect
+    
+    def _account(self, effect: BaseStatusEffect, stacks: int):
+        """把效果 stacks 层的属性值计入总和（stacks为负时扣除）"""
+        totals = self._totals
+        for stat, value in self._contributions[effect]:
+            totals[stat] += value * stacks
     
     def __len__(self) -> int:
-        return len(self.status_effects)
+        return len(self._entries)
     
     def __iter__(self):
-        return iter(self.status_effects)
+        """按 (优先级, 名称) 从高到低、同键按施加顺序遍历（被动效果的剩余回合先补齐）"""
+        buckets = self._buckets
+        settle = self._settle
+        for key in reversed(self._keys):
+            for effect in buckets[key]:
+                settle(effect)
+                yield effect
     
     def __contains__(self, name: str) -> bool:
         return self.has_status(name)
@@ -0,0 +1,76 @@
+"""状态类型注册表 - 为每种状态效果类分配小整数编号并预先计算互斥矩阵
+
+每个状态效果类第一次被施加时登记，得到编号 i（对应位 1 << i）。
+blocked_by(i) 是一个位掩码：其中每一位对应的状态类的 exclusive_with 包含编号 i 的状态名，
+即这些状态存在时编号 i 的状态无法施加。StatusManager 维护当前存在的状态类位掩码，
+两者按位与即可在 O(1) 内完成互斥检查。
+注册表同时记录每个状态类是否重写了 on_tick，没有重写的被动效果不需要每回合结算。
+
+互斥关系取自该类第一次登记的实例的 exclusive_with（同一个类的互斥列表应当固定）。
+"""
+
+from typing import Dict, List, Type
+
+from .base_status import BaseStatusEffect
+
+
+class StatusRegistry:
+    """状态效果类 -> 编号，及按编号索引的互斥矩阵"""
+
+    def __init__(self):
+        self._ids: Dict[Type[BaseStatusEffect], int] = {}
+        self._classes: List[Type[BaseStatusEffect]] = []
+        self._blocked_by: List[int] = []
+        self._has_tick: List[bool] = []
+        # 状态名 -> 使用该名称的状态类位掩码 / exclusive_with 包含该名称的状态类位掩码
+        self._name_masks: Dict[str, int] = {}
+        self._excluder_masks: Dict[str, int] = {}
+
+    def register(self, effect: BaseStatusEffect) -> int:
+        """返回效果所属状态类的编号，第一次出现时登记并更新互斥矩阵"""
+        status_id = self._ids.get(type(effect))
+        if status_id is None:
+            status_id = self._add(type(effect), effect.data.name, effect.data.exclusive_with)
+        return status_id
+
+    def blocked_by(self, status_id: int) -> int:
+        """存在时会阻止编号 status_id 的状态施加的状态类位掩码"""
+        return self._blocked_by[status_id]
+
+    def has_tick(self, status_id: int) -> bool:
+        """该状态类是否有每回合行为（重写了 on_tick）"""
+        return self._has_tick[status_id]
+
+    def status_class(self, status_id: int) -> Type[BaseStatusEffect]:
+        return self._classes[status_id]
+
+    def _add(self, cls: Type[BaseStatusEffect], name: str, exclusive_with: list) -> int:
+        status_id = len(self._classes)
+        bit = 1 << status_id
+        self._ids[cls] = status_id
+        self._classes.append(cls)
+        self._has_tick.append(cls.on_tick is not BaseStatusEffect.on_tick)
+        self._name_masks[name] = self._name_masks.get(name, 0) | bit
+
+        # 新类排斥的已登记状态：这些状态此后会被新类阻止
+        for target in set(exclusive_with):
+            self._excluder_masks[target] = self._excluder_masks.get(target, 0) | bit
+            targets = self._name_masks.get(target, 0) & ~bit
+            while targets:
+                low = targets & -targets
+                self._blocked_by[low.bit_length() - 1] |= bit
+                targets ^= low
+
+        # 已登记（含新类自身）中排斥新类名称的状态
+        self._blocked_by.append(self._excluder_masks.get(name, 0))
+        return status_id
+
+    def __len__(self) -> int:
+        return len(self._classes)
+
+    def __contains__(self, cls: Type[BaseStatusEffect]) -> bool:
+        return cls in self._ids
+
+
+# 进程内共用的注册表
+STATUS_REGISTRY = StatusRegistry()